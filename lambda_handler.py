@@ -1,19 +1,92 @@
 import json
+import logging
+import traceback
 import boto3
 import os
 import base64
+import hashlib
+import re
+import threading
 import time
 import requests
+import urllib3
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from requests.adapters import HTTPAdapter, Retry
 from typing import Dict, List, Optional
 
-# Initialize AWS clients
-sts = boto3.client('sts')
-secrets_manager = boto3.client('secretsmanager')
-sns = boto3.client('sns')
-ec2 = boto3.client('ec2')
-sqs = boto3.client('sqs')
+# orjson encodes/decodes several times faster than stdlib json - used on the
+# hot paths (Graph list responses, SQS message bodies). Fall back to stdlib
+# when the deployment package doesn't bundle it.
+try:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+# Connect/read timeout applied to outbound HTTP calls. A healthy TCP connect
+# completes well under 5s; the old single 30s value meant an unreachable
+# tenant blocked every call for the full read timeout before failing.
+REQUEST_TIMEOUT = (5, 30)
+
+# Module logger - Lambda's runtime already attaches a CloudWatch handler to
+# the root logger, so raising LOG_LEVEL skips the formatting work entirely
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+
+# Throttling/5xx from AWS APIs are worth a redelivery - permanent input
+# errors are not, and retrying them just re-runs the expensive AD work
+_RETRYABLE_AWS_ERROR_CODES = frozenset({
+    'ThrottlingException', 'Throttling', 'TooManyRequestsException',
+    'RequestLimitExceeded', 'ServiceUnavailable', 'InternalError',
+})
+
+def _is_retryable_aws_error(exc):
+    """True when exc is a ClientError that SNS/SQS redelivery could fix"""
+    if not isinstance(exc, ClientError):
+        return False
+    error = exc.response.get('Error', {})
+    status = exc.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+    return error.get('Code') in _RETRYABLE_AWS_ERROR_CODES or status >= 500
+
+
+def _body_snippet(response, limit=500):
+    """First bytes of a response body for logs, without decoding the whole body"""
+    return response.content[:limit].decode('utf-8', 'replace')
+
+# Shared client config - keep-alive avoids a fresh TLS handshake per AWS
+# call on warm containers, and the pool is sized for the thread fan-outs
+_BOTO_CFG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={'mode': 'standard', 'max_attempts': 3},
+)
+
+# Lazily-created AWS clients - each boto3.client() call parses service model
+# JSON, so only the services a code path actually touches get initialized.
+# Creation is locked because boto3.client() on the implicit default session
+# is not thread-safe and the background pool can race the main thread here.
+_aws_clients = {}
+_aws_clients_lock = threading.Lock()
+
+def aws_client(service_name):
+    """Get (or create) a cached boto3 client for the given service"""
+    client = _aws_clients.get(service_name)
+    if client is None:
+        with _aws_clients_lock:
+            client = _aws_clients.get(service_name)
+            if client is None:
+                client = boto3.client(service_name, config=_BOTO_CFG)
+                _aws_clients[service_name] = client
+    return client
 
 # Environment variables
 AD_CREDENTIALS_SECRET = os.environ['AD_CREDENTIALS_SECRET']
@@ -28,6 +101,16 @@ OU_MAPPING_SECRET = os.environ['OU_MAPPING_SECRET']
 M365_DELAY_QUEUE_URL = os.environ.get('M365_DELAY_QUEUE_URL', '')
 ATLASSIAN_ENABLED = os.environ.get('ATLASSIAN', 'false').lower() == 'true'
 
+# Post a Jira comment on every scheduled retry (each one is an API call);
+# default is to comment only on the terminal success/failure
+VERBOSE_JIRA_UPDATES = os.environ.get('VERBOSE_JIRA_UPDATES', 'false').lower() == 'true'
+
+# Optional EventBridge Scheduler configuration - when both are set, delayed
+# M365 processing uses one-time schedules instead of SQS DelaySeconds (delayed
+# SQS messages count against the 120k in-flight quota for the full delay)
+SCHEDULER_ROLE_ARN = os.environ.get('SCHEDULER_ROLE_ARN', '')
+LAMBDA_FUNCTION_ARN = os.environ.get('LAMBDA_FUNCTION_ARN', '')
+
 # Cross-account configuration
 PROD_ACCOUNT_ID = os.environ.get('PROD_ACCOUNT_ID', 'YOUR_ACCOUNT_ID')
 CROSS_ACCOUNT_ROLE_NAME = os.environ.get('CROSS_ACCOUNT_ROLE_NAME', 'EmployeeOnboardingCrossAccountSSMRole')
@@ -37,54 +120,221 @@ EXTERNAL_ID = os.environ.get('EXTERNAL_ID', 'employee-onboarding-prod-access')
 GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
 GRAPH_AUTH_URL = "https://login.microsoftonline.com"
 
+# Pooled urllib3 manager for the standalone Jira comment/notification path -
+# created once so each ticket update reuses the same keep-alive connection
+_jira_http = urllib3.PoolManager(
+    num_pools=2,
+    maxsize=8,
+    timeout=urllib3.Timeout(connect=REQUEST_TIMEOUT[0], read=REQUEST_TIMEOUT[1])
+)
+
+# Worker pool for status-only side calls (Jira progress comments, AD sync
+# trigger) that don't need to block the onboarding critical path
+_background_pool = ThreadPoolExecutor(max_workers=4)
+
+# Recently posted comment digests per ticket - duplicate status comments
+# (e.g. an error path firing twice) are skipped inside a short window
+_recent_jira_comments = {}
+JIRA_COMMENT_DEDUPE_SECONDS = 5
+
+# Project keys whose tickets never get real Jira comments. Only TEST is
+# skipped by default - extra keys (e.g. SANDBOX,DEV) are opt-in via env so
+# instances with a real project under those keys keep their updates
+_TEST_PROJECTS = frozenset(
+    {'TEST'} | {
+        key.strip().upper()
+        for key in os.environ.get('JIRA_TEST_PROJECT_KEYS', '').split(',')
+        if key.strip()
+    }
+)
+
+# ADF skeleton for a single-paragraph Jira comment - only the text node
+# changes per call, so the surrounding structure is serialized once
+_ADF_COMMENT_TEMPLATE = (
+    '{"body":{"type":"doc","version":1,"content":'
+    '[{"type":"paragraph","content":[{"type":"text","text":%s}]}]}}'
+)
+
+# Prebuilt Jira auth headers for the comment path - the secret fetch is
+# cached, but the base64 encode and dict build shouldn't repeat per comment
+_jira_auth_headers = None
+
+def _get_jira_headers():
+    """Get (or build) the cached Jira Basic-auth headers
+
+    Returns None when the Jira secret can't be fetched - callers treat
+    that as "can't post" rather than raising.
+    """
+    global _jira_auth_headers
+
+    if _jira_auth_headers is None:
+        jira_creds = get_secret(JIRA_CREDENTIALS_SECRET)
+        if not jira_creds:
+            return None
+        auth_string = f"{jira_creds['username']}:{jira_creds['apiToken']}"
+        auth_b64 = base64.b64encode(auth_string.encode('ascii')).decode('ascii')
+        _jira_auth_headers = {
+            'Authorization': f'Basic {auth_b64}',
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
+    return _jira_auth_headers
+
+# Shared HTTP session - reuses keep-alive connections across all Graph/Jira
+# calls instead of paying a TCP+TLS handshake per request
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET', 'POST', 'PATCH']
+    )
+))
+
 # Global variables for cross-account clients
 ssm_prod = None
 ec2_prod = None
 
+# When the assumed-role credentials behind the cached clients expire -
+# refreshed with a 120s safety margin so in-flight calls never hit an
+# expired token on a long-lived warm container
+_cross_account_expiration = None
+
+# Secrets Manager cache - secrets are fetched once per container and refreshed
+# after the TTL so credential rotation is still picked up
+SECRET_CACHE_TTL_SECONDS = 3600
+_secret_cache = {}
+
+# Completed delayed-processing keys - guards against duplicate SQS deliveries
+# re-running the whole Graph/Jira flow within a warm container
+IDEMPOTENCY_TTL_SECONDS = 3600
+_completed_processing = {}
+
+def build_idempotency_key(ticket_key, user_email):
+    """Stable key identifying one onboarding's delayed processing"""
+    return hashlib.sha256(f"{ticket_key}:{user_email}".encode()).hexdigest()
+
+def already_processed(idempotency_key):
+    """Check whether this delayed processing already completed in this container"""
+    completed_at = _completed_processing.get(idempotency_key)
+    return completed_at is not None and time.time() - completed_at < IDEMPOTENCY_TTL_SECONDS
+
+def mark_processed(idempotency_key):
+    """Record a completed delayed processing run"""
+    _completed_processing[idempotency_key] = time.time()
+
+def send_m365_delay_messages(messages, delay_seconds=900):
+    """Send delayed-processing messages to SQS, batched 10 per API call"""
+
+    message_ids = []
+
+    # SendMessageBatch accepts at most 10 entries per call
+    for i in range(0, len(messages), 10):
+        chunk = messages[i:i + 10]
+
+        response = aws_client('sqs').send_message_batch(
+            QueueUrl=M365_DELAY_QUEUE_URL,
+            Entries=[
+                {
+                    'Id': str(idx),
+                    'MessageBody': json_dumps(message),
+                    'DelaySeconds': delay_seconds
+                }
+                for idx, message in enumerate(chunk)
+            ]
+        )
+
+        for failure in response.get('Failed', []):
+            logger.warning("Failed to enqueue delayed message %s: %s", failure['Id'], failure.get('Message'))
+
+        message_ids.extend(entry['MessageId'] for entry in response.get('Successful', []))
+
+    return message_ids
+
 def schedule_m365_processing(user_email, ticket_key, employee_data, source_user_identifier=None, delay_seconds=900):
     """Schedule M365 processing with delay (default 15 minutes)"""
-    
+
+    # Create message for delayed processing
+    delayed_message = {
+        'processing_type': 'M365_INTEGRATION',
+        'user_email': user_email,
+        'ticket_key': ticket_key,
+        'employee_data': employee_data,
+        'source_user_identifier': source_user_identifier,
+        'scheduled_time': datetime.now().isoformat(),
+        'retry_count': 0,
+        'idempotency_key': build_idempotency_key(ticket_key, user_email)
+    }
+
+    # Prefer EventBridge Scheduler when configured - a one-time schedule costs
+    # less than a delayed SQS message and doesn't sit in-flight for 15 minutes
+    if SCHEDULER_ROLE_ARN and LAMBDA_FUNCTION_ARN:
+        try:
+            schedule_name = f"m365-{delayed_message['idempotency_key'][:32]}"
+            run_at = (datetime.utcnow() + timedelta(seconds=delay_seconds)).strftime('%Y-%m-%dT%H:%M:%S')
+
+            # The pinned SDK predates ActionAfterCompletion, so the schedule
+            # name travels in the payload and the fired invocation deletes it
+            delayed_message['schedule_name'] = schedule_name
+
+            aws_client('scheduler').create_schedule(
+                Name=schedule_name,
+                ScheduleExpression=f"at({run_at})",
+                FlexibleTimeWindow={'Mode': 'OFF'},
+                Target={
+                    'Arn': LAMBDA_FUNCTION_ARN,
+                    'RoleArn': SCHEDULER_ROLE_ARN,
+                    'Input': json_dumps(delayed_message)
+                }
+            )
+
+            logger.info("Scheduled M365 processing for %s in %s minutes via EventBridge Scheduler", user_email, delay_seconds / 60)
+
+            return {
+                'scheduled': True,
+                'delay_minutes': delay_seconds / 60,
+                'schedule_name': schedule_name,
+                'user_email': user_email
+            }
+        except Exception as e:
+            logger.warning("EventBridge Scheduler failed, falling back to SQS delay: %s", str(e))
+
     if not M365_DELAY_QUEUE_URL:
-        print("M365_DELAY_QUEUE_URL not configured, proceeding with immediate processing")
+        logger.info("M365_DELAY_QUEUE_URL not configured, proceeding with immediate processing")
         return process_microsoft_365_integration_enhanced(user_email, source_user_identifier)
-    
+
     try:
-        # Create message for delayed processing
-        delayed_message = {
-            'processing_type': 'M365_INTEGRATION',
-            'user_email': user_email,
-            'ticket_key': ticket_key,
-            'employee_data': employee_data,
-            'source_user_identifier': source_user_identifier,
-            'scheduled_time': datetime.now().isoformat(),
-            'retry_count': 0
-        }
-        
-        # Send message with delay
-        response = sqs.send_message(
-            QueueUrl=M365_DELAY_QUEUE_URL,
-            MessageBody=json.dumps(delayed_message),
-            DelaySeconds=delay_seconds  # 15 minutes = 900 seconds
-        )
-        
-        print(f"Scheduled M365 processing for {user_email} in {delay_seconds/60} minutes")
-        print(f"SQS Message ID: {response['MessageId']}")
-        
+        # Send message with delay (batch API so bulk onboardings share calls)
+        message_ids = send_m365_delay_messages([delayed_message], delay_seconds)
+
+        if not message_ids:
+            raise Exception("SQS batch send reported no successful entries")
+
+        logger.info("Scheduled M365 processing for %s in %s minutes", user_email, delay_seconds / 60)
+        logger.info("SQS Message ID: %s", message_ids[0])
+
         return {
             'scheduled': True,
             'delay_minutes': delay_seconds / 60,
-            'message_id': response['MessageId'],
+            'message_id': message_ids[0],
             'user_email': user_email
         }
-        
+
     except Exception as e:
-        print(f"Error scheduling M365 processing: {str(e)}")
+        logger.warning("Error scheduling M365 processing: %s", str(e))
         # Fallback to immediate processing
         return process_microsoft_365_integration_enhanced(user_email, source_user_identifier)
 
 def determine_event_type(event):
-    """Determine if this is SNS (new user) or SQS (delayed M365) event"""
-    
+    """Determine if this is SNS (new user), SQS (delayed M365) or EventBridge Scheduler event"""
+
+    # EventBridge Scheduler invokes the Lambda directly with the message as payload
+    if event.get('processing_type') == 'M365_INTEGRATION':
+        return 'scheduled_m365'
+
     if 'Records' in event:
         if len(event['Records']) > 0:
             record = event['Records'][0]
@@ -99,23 +349,102 @@ def determine_event_type(event):
     
     return 'unknown'
 
+def _parse_sns_onboarding_message(sns_record, message_content):
+    """Extract the onboarding payload from an SNS record
+
+    Publishers that set structured MessageAttributes (ticketKey plus a
+    JSON-encoded employeeData attribute) are read without decoding the
+    message body at all; otherwise the body is parsed as JSON, unwrapping
+    the Jira automationData envelope when present, with the historical
+    MessageAttributes fallbacks for malformed bodies.
+    """
+
+    # Only take the fast path when the full structured payload is there -
+    # some publishers set flattened dotted attributes (employeeData.fullName)
+    # alongside a JSON body, and those must still go through body parsing
+    attributes = sns_record.get('MessageAttributes') or {}
+    if (attributes.get('ticketKey', {}).get('Value')
+            and attributes.get('employeeData', {}).get('Value')):
+        sns_message = {
+            key: value['Value']
+            for key, value in attributes.items()
+            if 'Value' in value
+        }
+        # employeeData can't be flattened to a string attribute, so it
+        # rides along as a JSON-encoded attribute value
+        try:
+            sns_message['employeeData'] = json_loads(sns_message['employeeData'])
+            return sns_message
+        except ValueError:
+            logger.warning("Malformed employeeData attribute, falling back to message body")
+
+    try:
+        # First try to parse as direct JSON
+        sns_message = json_loads(message_content)
+
+        # Check if it's wrapped in automationData (Jira format) - only
+        # then pay for the second decode of the nested string
+        if (isinstance(sns_message, dict)
+                and isinstance(sns_message.get('automationData'), dict)
+                and 'default' in sns_message['automationData']):
+            sns_message = json_loads(sns_message['automationData']['default'])
+        return sns_message
+
+    except (ValueError, KeyError, TypeError):
+        # If that fails, check if it's from Jira automation with MessageAttributes
+        if attributes:
+            # Jira sends data in MessageAttributes with a 'default' key
+            default_attr = attributes.get('default', {})
+            if default_attr and 'Value' in default_attr:
+                return json_loads(default_attr['Value'])
+
+            # Try to build from individual attributes
+            return {
+                key: value['Value']
+                for key, value in attributes.items()
+                if 'Value' in value
+            }
+
+        # Last resort - record that the message couldn't be parsed
+        return {'error': 'Could not parse message', 'raw': message_content}
+
+# Precomputed URL templates for the hottest Graph endpoints - avoids
+# rebuilding the base-URL prefix on every call in the replication loops
+GRAPH_USER_URL = GRAPH_BASE_URL + "/users/{}"
+GRAPH_GROUP_MEMBERS_REF_URL = GRAPH_BASE_URL + "/groups/{}/members/$ref"
+GRAPH_DIRECTORY_OBJECT_URL = GRAPH_BASE_URL + "/directoryObjects/{}"
+
+# SKU part-number patterns that identify a Business Premium license
+# ('SPB' is Microsoft 365 Business Premium)
+BUSINESS_PREMIUM_PATTERNS = ('SPB', 'O365_BUSINESS_PREMIUM', 'BUSINESS_PREMIUM')
+
+# Graph access token cache - survives across warm invocations so each new
+# Microsoft365Manager() doesn't re-authenticate against login.microsoftonline.com
+_m365_token = {'token': None, 'expires_mono': 0.0}
+
+# Azure AD user lookup cache - replication bursts look up the same source user
+# repeatedly (e.g. several hires copying access from one manager). Only found
+# users are cached so the AD-sync polling path still sees new users appear.
+USER_LOOKUP_TTL_SECONDS = 600
+_m365_user_cache = {}
+
 class Microsoft365Manager:
     def __init__(self):
-        self.access_token = None
-        self.token_expires = None
         self.credentials = None
-        
+
     def get_credentials(self):
         """Get Microsoft 365 credentials from AWS Secrets Manager"""
         if not self.credentials:
             self.credentials = get_secret(M365_CREDENTIALS_SECRET)
         return self.credentials
-        
+
     def get_access_token(self):
-        """Get Microsoft Graph API access token"""
-        if self.access_token and self.token_expires and datetime.now() < self.token_expires:
-            return self.access_token
-            
+        """Get Microsoft Graph API access token (cached per container)"""
+        # Monotonic float comparison - cheaper than datetime objects and
+        # immune to wall-clock adjustments
+        if _m365_token['token'] and time.monotonic() < _m365_token['expires_mono']:
+            return _m365_token['token']
+
         try:
             creds = self.get_credentials()
             
@@ -129,42 +458,53 @@ class Microsoft365Manager:
             
             headers = {'Content-Type': 'application/x-www-form-urlencoded'}
             
-            response = requests.post(
+            response = http_session.post(
                 f"{GRAPH_AUTH_URL}/{creds['tenant_id']}/oauth2/v2.0/token",
                 data=token_data,
                 headers=headers,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
             response.raise_for_status()
-            token_info = response.json()
-            self.access_token = token_info['access_token']
+            token_info = json_loads(response.content)
             expires_in = token_info.get('expires_in', 3600)
-            self.token_expires = datetime.now() + timedelta(seconds=expires_in - 60)
-            return self.access_token
+            _m365_token['token'] = token_info['access_token']
+            _m365_token['expires_mono'] = time.monotonic() + expires_in - 60
+            return _m365_token['token']
                 
         except Exception as e:
-            print(f"Error getting Microsoft 365 access token: {str(e)}")
+            logger.warning("Error getting Microsoft 365 access token: %s", str(e))
             raise
             
     def check_user_exists(self, user_email):
         """Check if user exists in Azure AD (quick check)"""
+        cache_key = user_email.lower().strip()
+        cached = _m365_user_cache.get(cache_key)
+        if cached and time.time() - cached['fetched_at'] < USER_LOOKUP_TTL_SECONDS:
+            return True
+
         headers = {
             'Authorization': f'Bearer {self.get_access_token()}',
             'Content-Type': 'application/json'
         }
-        
+
         try:
-            response = requests.get(
-                f"{GRAPH_BASE_URL}/users/{user_email}",
+            # Graph rejects HEAD on /users, so select just the fields the
+            # lookup cache needs instead of downloading the full user object
+            response = http_session.get(
+                GRAPH_USER_URL.format(user_email) + '?$select=id,displayName,mail,userPrincipalName',
                 headers=headers,
-                timeout=15
+                timeout=(5, 15)
             )
-            
-            return response.status_code == 200
-            
+
+            if response.status_code == 200:
+                _m365_user_cache[cache_key] = {'user': json_loads(response.content), 'fetched_at': time.time()}
+                return True
+
+            return False
+
         except Exception as e:
-            print(f"Error checking user existence: {str(e)}")
+            logger.warning("Error checking user existence: %s", str(e))
             return False
     
     def get_available_licenses(self):
@@ -175,14 +515,14 @@ class Microsoft365Manager:
         }
         
         try:
-            response = requests.get(
-                f"{GRAPH_BASE_URL}/subscribedSkus",
+            response = http_session.get(
+                f"{GRAPH_BASE_URL}/subscribedSkus?$select=skuId,skuPartNumber,prepaidUnits,consumedUnits",
                 headers=headers,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
-            
+
             response.raise_for_status()
-            skus = response.json()['value']
+            skus = json_loads(response.content)['value']
             available_licenses = []
             
             for sku in skus:
@@ -201,40 +541,33 @@ class Microsoft365Manager:
             return available_licenses
                 
         except Exception as e:
-            print(f"Error getting available licenses: {str(e)}")
+            logger.warning("Error getting available licenses: %s", str(e))
             raise
     
     def find_business_premium_license(self):
         """Find Business Premium license SKU"""
         licenses = self.get_available_licenses()
-        
-        # Look for Business Premium licenses (common SKU part numbers)
-        business_premium_patterns = [
-            'SPB',  # Microsoft 365 Business Premium
-            'O365_BUSINESS_PREMIUM',
-            'BUSINESS_PREMIUM',
-            'M365_BUSINESS_PREMIUM',
-            'PREMIUM'
-        ]
-        
+
+        # Uppercase each SKU part number once rather than per pattern check
+        licenses_upper = [(license, license['skuPartNumber'].upper()) for license in licenses]
+
         # First, look for exact Business Premium matches
-        for license in licenses:
-            for pattern in business_premium_patterns[:3]:  # Check exact patterns first
-                if pattern in license['skuPartNumber'].upper():
-                    print(f"Found Business Premium license: {license['skuPartNumber']} ({license['available']} available)")
-                    return license
-        
+        for license, sku_name in licenses_upper:
+            if any(pattern in sku_name for pattern in BUSINESS_PREMIUM_PATTERNS):
+                logger.info("Found Business Premium license: %s (%s available)", license['skuPartNumber'], license['available'])
+                return license
+
         # Then look for any Premium license
-        for license in licenses:
-            if 'PREMIUM' in license['skuPartNumber'].upper() and license['available'] > 0:
-                print(f"Found Premium license: {license['skuPartNumber']} ({license['available']} available)")
+        for license, sku_name in licenses_upper:
+            if 'PREMIUM' in sku_name and license['available'] > 0:
+                logger.info("Found Premium license: %s (%s available)", license['skuPartNumber'], license['available'])
                 return license
-                
+
         # Return the first available license as fallback
         if licenses:
-            print(f"No Premium license found, using: {licenses[0]['skuPartNumber']}")
+            logger.info("No Premium license found, using: %s", licenses[0]['skuPartNumber'])
             return licenses[0]
-            
+
         raise Exception("No available Microsoft 365 licenses found")
     
     def set_user_usage_location(self, user_email, usage_location='GB'):
@@ -249,22 +582,22 @@ class Microsoft365Manager:
                 "usageLocation": usage_location
             }
             
-            response = requests.patch(
-                f"{GRAPH_BASE_URL}/users/{user_email}",
+            response = http_session.patch(
+                GRAPH_USER_URL.format(user_email),
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code in [200, 204]:
-                print(f"Successfully set usage location {usage_location} for {user_email}")
+                logger.info("Successfully set usage location %s for %s", usage_location, user_email)
                 return True
             else:
-                print(f"Failed to set usage location: {response.status_code} - {response.text}")
+                logger.warning("Failed to set usage location: %s - %s", response.status_code, response.text)
                 return False
                 
         except Exception as e:
-            print(f"Error setting usage location for {user_email}: {str(e)}")
+            logger.warning("Error setting usage location for %s: %s", user_email, str(e))
             return False
     
     def assign_license_to_user(self, user_email, license_sku_id=None):
@@ -293,15 +626,15 @@ class Microsoft365Manager:
                 "removeLicenses": []
             }
             
-            response = requests.post(
+            response = http_session.post(
                 f"{GRAPH_BASE_URL}/users/{user_email}/assignLicense",
                 headers=headers,
                 json=license_payload,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code in [200, 202]:
-                print(f"Successfully assigned license {license_name} to {user_email}")
+                logger.info("Successfully assigned license %s to %s", license_name, user_email)
                 return {
                     'success': True,
                     'license_sku_id': license_sku_id,
@@ -313,7 +646,7 @@ class Microsoft365Manager:
                 raise Exception(f"Failed to assign license: {response.status_code} - {error_detail}")
                 
         except Exception as e:
-            print(f"Error assigning license to {user_email}: {str(e)}")
+            logger.warning("Error assigning license to %s: %s", user_email, str(e))
             raise
     
     def get_user_groups(self, user_email):
@@ -324,20 +657,36 @@ class Microsoft365Manager:
         }
         
         try:
-            response = requests.get(
-                f"{GRAPH_BASE_URL}/users/{user_email}/memberOf",
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                groups = response.json()['value']
-                return [{'id': group['id'], 'displayName': group['displayName']} for group in groups]
-            else:
-                raise Exception(f"Failed to get user groups: {response.status_code} - {response.text}")
-                
+            # Fetch the filtering fields alongside id/displayName so callers can
+            # skip mail-enabled/dynamic groups without a follow-up GET per group,
+            # and page through nextLink so large memberships aren't truncated
+            url = (f"{GRAPH_BASE_URL}/users/{user_email}/memberOf"
+                   f"?$select=id,displayName,mailEnabled,securityEnabled,membershipRule&$top=999")
+            groups = []
+
+            while url:
+                response = http_session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+
+                if response.status_code != 200:
+                    raise Exception(f"Failed to get user groups: {response.status_code} - {response.text}")
+
+                data = json_loads(response.content)
+                groups.extend(
+                    {
+                        'id': group['id'],
+                        'displayName': group.get('displayName'),
+                        'mailEnabled': group.get('mailEnabled'),
+                        'securityEnabled': group.get('securityEnabled'),
+                        'membershipRule': group.get('membershipRule')
+                    }
+                    for group in data['value']
+                )
+                url = data.get('@odata.nextLink')
+
+            return groups
+
         except Exception as e:
-            print(f"Error getting groups for {user_email}: {str(e)}")
+            logger.warning("Error getting groups for %s: %s", user_email, str(e))
             return []
     
     def add_user_to_group(self, user_email, group_id):
@@ -348,54 +697,32 @@ class Microsoft365Manager:
         }
         
         try:
-            # First, check if this is a mail-enabled security group or other problematic type
-            group_response = requests.get(
-                f"{GRAPH_BASE_URL}/groups/{group_id}",
-                headers=headers,
-                timeout=30
-            )
-            
-            if group_response.status_code == 200:
-                group_data = group_response.json()
-                group_name = group_data.get('displayName', 'Unknown')
-                
-                # Skip mail-enabled security groups as they can't be modified via Graph API
-                if group_data.get('mailEnabled') and group_data.get('securityEnabled'):
-                    print(f"Skipping mail-enabled security group: {group_name} (requires Exchange management)")
-                    return False
-                
-                # Skip dynamic groups
-                if group_data.get('membershipRule'):
-                    print(f"Skipping dynamic group: {group_name}")
-                    return False
-                
-                # Skip certain system groups
-                if group_name.lower() in ['all users', 'all company', 'everyone']:
-                    print(f"Skipping system group: {group_name}")
-                    return False
-            
+            # Callers are expected to have filtered out mail-enabled/dynamic/
+            # system groups (get_user_groups returns the fields needed), so no
+            # per-group metadata GET is made here
+
             # Get user object ID
-            user_response = requests.get(
-                f"{GRAPH_BASE_URL}/users/{user_email}",
+            user_response = http_session.get(
+                GRAPH_USER_URL.format(user_email) + '?$select=id',
                 headers=headers,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
             if user_response.status_code != 200:
                 raise Exception(f"Failed to get user details: {user_response.status_code}")
             
-            user_id = user_response.json()['id']
+            user_id = json_loads(user_response.content)['id']
             
             # Add user to group
             payload = {
-                "@odata.id": f"{GRAPH_BASE_URL}/directoryObjects/{user_id}"
+                "@odata.id": GRAPH_DIRECTORY_OBJECT_URL.format(user_id)
             }
             
-            response = requests.post(
-                f"{GRAPH_BASE_URL}/groups/{group_id}/members/$ref",
+            response = http_session.post(
+                GRAPH_GROUP_MEMBERS_REF_URL.format(group_id),
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code in [204, 200]:
@@ -403,60 +730,137 @@ class Microsoft365Manager:
             elif response.status_code == 400 and "already exist" in response.text.lower():
                 return True
             elif response.status_code == 403:
-                print(f"Insufficient permissions for group {group_id}")
+                logger.info("Insufficient permissions for group %s", group_id)
                 return False
             elif response.status_code == 400 and "mail-enabled" in response.text.lower():
-                print(f"Cannot modify mail-enabled group {group_id} via Graph API")
+                logger.warning("Cannot modify mail-enabled group %s via Graph API", group_id)
                 return False
             else:
-                print(f"Failed to add user to group {group_id}: {response.status_code}")
+                logger.warning("Failed to add user to group %s: %s", group_id, response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"Error adding user {user_email} to group {group_id}: {str(e)}")
+            logger.warning("Error adding user %s to group %s: %s", user_email, group_id, str(e))
             return False
     
+    def graph_batch(self, batch_requests):
+        """Execute multiple Graph requests per HTTP call via the /$batch endpoint"""
+        headers = {
+            'Authorization': f'Bearer {self.get_access_token()}',
+            'Content-Type': 'application/json'
+        }
+
+        responses = {}
+
+        # Graph accepts at most 20 requests per batch
+        for i in range(0, len(batch_requests), 20):
+            chunk = batch_requests[i:i + 20]
+
+            response = http_session.post(
+                f"{GRAPH_BASE_URL}/$batch",
+                headers=headers,
+                json={'requests': chunk},
+                timeout=REQUEST_TIMEOUT
+            )
+
+            response.raise_for_status()
+
+            for item in json_loads(response.content).get('responses', []):
+                responses[item['id']] = item
+
+        return responses
+
+    def setup_user_licensing(self, user_email, license_sku_id, usage_location='GB'):
+        """Check the user and assign their license in one /$batch round trip
+
+        The delayed-processing path used to make three sequential Graph
+        calls (existence GET, usageLocation PATCH, assignLicense POST);
+        dependsOn chaining collapses them into a single HTTP request.
+        Returns the per-request responses keyed 'user'/'location'/'license'.
+        """
+        return self.graph_batch([
+            {
+                'id': 'user',
+                'method': 'GET',
+                'url': f'/users/{user_email}?$select=id,displayName,mail,userPrincipalName'
+            },
+            {
+                'id': 'location',
+                'method': 'PATCH',
+                'url': f'/users/{user_email}',
+                'body': {'usageLocation': usage_location},
+                'headers': {'Content-Type': 'application/json'},
+                'dependsOn': ['user']
+            },
+            {
+                'id': 'license',
+                'method': 'POST',
+                'url': f'/users/{user_email}/assignLicense',
+                'body': {'addLicenses': [{'skuId': license_sku_id}], 'removeLicenses': []},
+                'headers': {'Content-Type': 'application/json'},
+                'dependsOn': ['location']
+            },
+        ])
+
     def find_user_by_email_or_name(self, search_term):
         """Find user in Azure AD by email or display name"""
+        cache_key = search_term.lower().strip()
+        cached = _m365_user_cache.get(cache_key)
+        if cached and time.time() - cached['fetched_at'] < USER_LOOKUP_TTL_SECONDS:
+            return cached['user']
+
         headers = {
             'Authorization': f'Bearer {self.get_access_token()}',
             'Content-Type': 'application/json'
         }
-        
+
         try:
             # Try direct email lookup first
             if '@' in search_term:
-                response = requests.get(
-                    f"{GRAPH_BASE_URL}/users/{search_term}",
+                response = http_session.get(
+                    GRAPH_USER_URL.format(search_term) + '?$select=id,displayName,mail,userPrincipalName',
                     headers=headers,
-                    timeout=30
+                    timeout=REQUEST_TIMEOUT
                 )
-                
+
                 if response.status_code == 200:
-                    return response.json()
-            
-            # Try search by display name or email
-            search_response = requests.get(
-                f"{GRAPH_BASE_URL}/users?$filter=displayName eq '{search_term}' or mail eq '{search_term}' or userPrincipalName eq '{search_term}'",
-                headers=headers,
-                timeout=30
+                    user = json_loads(response.content)
+                    _m365_user_cache[cache_key] = {'user': user, 'fetched_at': time.time()}
+                    return user
+
+            # Search by display name or email via the indexed $search (needs
+            # ConsistencyLevel: eventual) instead of an unindexed $filter scan;
+            # requests URL-encodes the params, so no string interpolation
+            search_headers = dict(headers)
+            search_headers['ConsistencyLevel'] = 'eventual'
+
+            search_response = http_session.get(
+                f"{GRAPH_BASE_URL}/users",
+                params={
+                    '$search': f'"displayName:{search_term}" OR "mail:{search_term}"',
+                    '$select': 'id,displayName,mail,userPrincipalName',
+                    '$top': '1'
+                },
+                headers=search_headers,
+                timeout=REQUEST_TIMEOUT
             )
-            
+
             if search_response.status_code == 200:
-                users = search_response.json()['value']
+                users = json_loads(search_response.content)['value']
                 if users:
+                    _m365_user_cache[cache_key] = {'user': users[0], 'fetched_at': time.time()}
                     return users[0]
-            
+
             return None
             
         except Exception as e:
-            print(f"Error finding user {search_term}: {str(e)}")
+            logger.warning("Error finding user %s: %s", search_term, str(e))
             return None
     
     def replicate_m365_access(self, source_user_identifier, target_user_email):
         """Replicate Microsoft 365 access from source user to target user"""
         try:
-            print(f"Replicating M365 access from {source_user_identifier} to {target_user_email}")
+            logger.info("Replicating M365 access from %s to %s", source_user_identifier, target_user_email)
             
             # Find source user
             source_user = self.find_user_by_email_or_name(source_user_identifier)
@@ -464,11 +868,11 @@ class Microsoft365Manager:
                 raise Exception(f"Source user {source_user_identifier} not found in Azure AD")
             
             source_email = source_user.get('mail') or source_user.get('userPrincipalName')
-            print(f"Found source user: {source_user['displayName']} ({source_email})")
+            logger.info("Found source user: %s (%s)", source_user['displayName'], source_email)
             
             # Get source user's groups
             source_groups = self.get_user_groups(source_email)
-            
+
             replication_results = {
                 'source_user': source_user['displayName'],
                 'source_email': source_email,
@@ -477,35 +881,170 @@ class Microsoft365Manager:
                 'groups_skipped': [],
                 'total_groups': len(source_groups)
             }
-            
-            # Add target user to same groups
+
+            if not source_groups:
+                return replication_results
+
+            # Resolve target user id once - it is the same for every group add
+            target_user = self.find_user_by_email_or_name(target_user_email)
+            if not target_user:
+                raise Exception(f"Target user {target_user_email} not found in Azure AD")
+            target_user_id = target_user['id']
+
+            # memberOf already returned the filtering fields, so skip-decisions
+            # happen in-process with no extra Graph round trips
+            groups_to_add = []
             for group in source_groups:
-                success = self.add_user_to_group(target_user_email, group['id'])
-                if success:
+                group_name = group.get('displayName') or group['id']
+
+                # Skip mail-enabled security groups as they can't be modified via Graph API
+                if group.get('mailEnabled') and group.get('securityEnabled'):
+                    logger.info("Skipping mail-enabled security group: %s (requires Exchange management)", group_name)
+                    replication_results['groups_skipped'].append(group_name)
+                    continue
+
+                # Skip dynamic groups
+                if group.get('membershipRule'):
+                    logger.info("Skipping dynamic group: %s", group_name)
+                    replication_results['groups_skipped'].append(group_name)
+                    continue
+
+                # Skip certain system groups
+                if group_name.lower() in ['all users', 'all company', 'everyone']:
+                    logger.info("Skipping system group: %s", group_name)
+                    replication_results['groups_skipped'].append(group_name)
+                    continue
+
+                groups_to_add.append({'id': group['id'], 'displayName': group_name})
+
+            # Batch the member-add POSTs, 20 per HTTP round trip
+            add_responses = self.graph_batch([
+                {
+                    'id': group['id'],
+                    'method': 'POST',
+                    'url': f"/groups/{group['id']}/members/$ref",
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': {'@odata.id': GRAPH_DIRECTORY_OBJECT_URL.format(target_user_id)}
+                }
+                for group in groups_to_add
+            ])
+
+            for group in groups_to_add:
+                resp = add_responses.get(group['id'], {})
+                status = resp.get('status')
+                error_text = json_dumps(resp.get('body') or {}).lower()
+
+                if status in [200, 204] or (status == 400 and 'already exist' in error_text):
                     replication_results['groups_added'].append(group['displayName'])
-                    print(f"Added {target_user_email} to group: {group['displayName']}")
+                    logger.info("Added %s to group: %s", target_user_email, group['displayName'])
                 else:
-                    # Check if it was skipped or failed
-                    if 'mail-enabled' in group.get('displayName', '').lower() or 'skipping' in str(success):
-                        replication_results['groups_skipped'].append(group['displayName'])
-                    else:
-                        replication_results['groups_failed'].append(group['displayName'])
-                    print(f"Could not add {target_user_email} to group: {group['displayName']}")
-            
+                    replication_results['groups_failed'].append(group['displayName'])
+                    logger.warning("Could not add %s to group: %s (%s)", target_user_email, group['displayName'], status)
+
             return replication_results
             
         except Exception as e:
-            print(f"Error replicating M365 access: {str(e)}")
+            logger.warning("Error replicating M365 access: %s", str(e))
             raise
 
+# Atlassian organization ID cache - the org doesn't change between invocations
+_atlassian_org_id = None
+
+# Licensed Atlassian products cache - refreshed hourly in case licensing changes
+_atlassian_products = {'products': None, 'fetched_at': 0}
+
+# Pooled session for Atlassian calls - kept separate from http_session because
+# the Jira basic-auth headers are installed on it as session defaults
+_atlassian_session = None
+
+# Instance-wide group and project listings - these barely change between
+# onboardings, so a warm container reuses them for a few minutes instead of
+# re-paging the full list on every event
+DIRECTORY_LIST_TTL_SECONDS = 300
+_atlassian_group_list = {'groups': None, 'fetched_at': 0}
+_atlassian_project_list = {'projects': None, 'fetched_at': 0}
+
+# Admin and system groups that are never replicated to new hires
+REPLICATION_SKIP_GROUPS = frozenset([
+    'administrators',
+    'site-admins',
+    'jira-admins',
+    'confluence-admins',
+    'system-administrators',
+    'trusted-users',
+    'users',  # Default users group
+    'anyone',
+    'anonymous',
+])
+
+# Group-name patterns that mark admin groups
+REPLICATION_SKIP_RE = re.compile(r'-admins|-administrators|admin-')
+
+# Classifier patterns for Jira group-add 400 responses - compiled once so a
+# failed add does a single pass over the error text per category
+_ERR_ALREADY_MEMBER_RE = re.compile(r'already (?:a member|in)', re.I)
+_ERR_RESTRICTED_RE = re.compile(r'cannot add users to|cannot be modified', re.I)
+_ERR_GROUP_MISSING_RE = re.compile(r'does not exist|group not found', re.I)
+_ERR_NOT_FOUND_RE = re.compile(r'not found', re.I)
+_ERR_PERMISSION_RE = re.compile(r'permission|not authorized', re.I)
+
 class AtlassianManager:
     """Manage Atlassian account creation and access replication using Admin API"""
-    
+
     def __init__(self):
         self.jira_creds = None
         self.base_url = None
         self.org_id = None
-        
+        self._auth_headers = None
+        self._user_cache = {}
+
+        # Endpoints hit repeatedly (group adds and membership checks run in
+        # per-group loops) - build the strings once instead of per iteration
+        self._ep_group_user = f"{JIRA_URL}/rest/api/3/group/user"
+        self._ep_group_member = f"{JIRA_URL}/rest/api/3/group/member"
+        self._ep_user_groups = f"{JIRA_URL}/rest/api/3/user/groups"
+        self._ep_servicedesk = f"{JIRA_URL}/rest/servicedeskapi/servicedesk"
+
+        # Per-product candidate group names - built lazily on first use from
+        # the resolved base URL (the shared instance is constructed at import
+        # time, before credentials resolve the site URL)
+        self._product_variants = None
+
+    def _get_product_variants(self):
+        """Candidate group names per product, keyed by product
+
+        The JSM customer groups are qualified with the organization name
+        from the site URL (company-name from company-name.atlassian.net).
+        Built on first use from the resolved base_url and cached - only
+        once a real URL is known, so a misconfigured import-time JIRA_URL
+        can't bake wrong names in for the container's lifetime.
+        """
+        if self._product_variants is not None:
+            return self._product_variants
+
+        base_url = self.base_url or JIRA_URL
+        org_name = base_url.split('//', 1)[1].split('.', 1)[0] if base_url else 'Your_Company_Name'
+        variants = {
+            'jira-software': ('jira-software-users', 'jira-users', 'users'),
+            'confluence': ('confluence-users',),
+            'jsm-customer': (
+                # JSM Customer access groups - with organization name
+                f"jira-servicemanagement-customers-{org_name}",  # This is the correct format!
+                f"jira-service-management-customers-{org_name}",
+                f"jira-servicedesk-customers-{org_name}",
+                # Also try without org name in case
+                'jira-servicemanagement-customers',
+                'jira-service-management-customers',
+                'jira-servicedesk-customers',
+                'service-desk-customers',
+                'servicedesk-customers',
+                'jsd-customers',
+            ),
+        }
+        if base_url:
+            self._product_variants = variants
+        return variants
+
     def get_credentials(self):
         """Get Atlassian credentials from existing Jira credentials"""
         if not self.jira_creds:
@@ -519,122 +1058,196 @@ class AtlassianManager:
                 
                 return self.jira_creds
             except Exception as e:
-                print(f"Error getting Atlassian credentials: {str(e)}")
+                logger.warning("Error getting Atlassian credentials: %s", str(e))
                 return None
         return self.jira_creds
     
     def get_auth_headers(self):
-        """Get authentication headers for Atlassian API"""
+        """Get authentication headers for Atlassian API (built once per instance)"""
+        if self._auth_headers:
+            return self._auth_headers
+
         creds = self.get_credentials()
         if not creds:
             return None
-        
+
         auth_string = f"{creds['username']}:{creds['apiToken']}"
         auth_b64 = base64.b64encode(auth_string.encode('ascii')).decode('ascii')
-        
-        return {
+
+        self._auth_headers = {
             'Authorization': f'Basic {auth_b64}',
             'Accept': 'application/json',
             'Content-Type': 'application/json'
         }
-    
-    def get_organization_id(self):
-        """Get the Atlassian organization ID"""
+        return self._auth_headers
+
+    def get_session(self):
+        """Get the pooled Atlassian HTTP session with auth headers installed"""
+        global _atlassian_session
+
+        if _atlassian_session is not None:
+            return _atlassian_session
+
         headers = self.get_auth_headers()
         if not headers:
             return None
-        
-        try:
-            # Get accessible resources to find org ID
-            response = requests.get(
-                'https://api.atlassian.com/oauth/token/accessible-resources',
-                headers=headers,
-                timeout=30
+
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=['GET', 'POST', 'PATCH']
+            )
+        ))
+        session.headers.update(headers)
+
+        _atlassian_session = session
+        return _atlassian_session
+
+    def get_organization_id(self):
+        """Get the Atlassian organization ID (cached per container)"""
+        global _atlassian_org_id
+
+        if _atlassian_org_id:
+            self.org_id = _atlassian_org_id
+            return self.org_id
+
+        session = self.get_session()
+        if not session:
+            return None
+
+        try:
+            # Get accessible resources to find org ID
+            response = session.get(
+                'https://api.atlassian.com/oauth/token/accessible-resources',
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code == 200:
-                resources = response.json()
+                resources = json_loads(response.content)
                 if resources and len(resources) > 0:
                     self.org_id = resources[0].get('id')
-                    print(f"Found organization ID: {self.org_id}")
+                    _atlassian_org_id = self.org_id
+                    logger.info("Found organization ID: %s", self.org_id)
                     return self.org_id
         except Exception as e:
-            print(f"Could not get organization ID: {str(e)}")
+            logger.warning("Could not get organization ID: %s", str(e))
         
         return None
     
     def check_user_exists(self, email: str) -> Dict:
         """Check if user exists in Atlassian and get their details"""
-        headers = self.get_auth_headers()
-        if not headers:
+        cache_key = email.lower().strip()
+        cached = self._user_cache.get(cache_key)
+        if cached:
+            return cached
+
+        session = self.get_session()
+        if not session:
             return {'exists': False}
-        
+
         try:
             # Search for user in Jira
-            response = requests.get(
+            response = session.get(
                 f"{self.base_url}/rest/api/3/user/search?query={email}",
-                headers=headers,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code == 200:
-                users = response.json()
+                users = json_loads(response.content)
                 if users and len(users) > 0:
                     user = users[0]
-                    return {
+                    # Only found users are cached - a replication run looks the
+                    # same email up once per group/role operation otherwise
+                    result = {
                         'exists': True,
                         'accountId': user.get('accountId'),
                         'displayName': user.get('displayName'),
                         'emailAddress': user.get('emailAddress'),
                         'active': user.get('active', False)
                     }
-            
+                    self._user_cache[cache_key] = result
+                    return result
+
             return {'exists': False}
             
         except Exception as e:
-            print(f"Error checking user existence: {str(e)}")
+            logger.warning("Error checking user existence: %s", str(e))
             return {'exists': False, 'error': str(e)}
     
     def get_available_products(self):
         """Get available products in the Atlassian instance"""
-        headers = self.get_auth_headers()
-        if not headers:
+        session = self.get_session()
+        if not session:
             return []
         
         try:
             # Try to get accessible resources first
-            response = requests.get(
+            response = session.get(
                 'https://api.atlassian.com/oauth/token/accessible-resources',
-                headers=headers,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code == 200:
-                resources = response.json()
+                resources = json_loads(response.content)
                 products = []
                 for resource in resources:
                     if 'name' in resource:
                         # Extract product identifiers from the resource
                         products.append(resource.get('name', '').lower())
-                print(f"Found accessible resources: {products}")
+                logger.info("Found accessible resources: %s", products)
                 return products
         except Exception as e:
-            print(f"Could not get accessible resources: {str(e)}")
+            logger.warning("Could not get accessible resources: %s", str(e))
         
         # Return default products as fallback
         return []
     
+    def get_valid_products(self):
+        """Discover licensed product keys from the instance license (cached per container)"""
+        global _atlassian_products
+
+        if _atlassian_products['products'] and time.time() - _atlassian_products['fetched_at'] < 3600:
+            return _atlassian_products['products']
+
+        session = self.get_session()
+        if not session:
+            return None
+
+        try:
+            response = session.get(
+                f"{self.base_url}/rest/api/3/instance/license",
+                timeout=REQUEST_TIMEOUT
+            )
+
+            if response.status_code == 200:
+                applications = json_loads(response.content).get('applications', [])
+                products = [app['id'] for app in applications if app.get('id')]
+
+                if products:
+                    _atlassian_products = {'products': products, 'fetched_at': time.time()}
+                    logger.info("Discovered licensed products: %s", products)
+                    return products
+        except Exception as e:
+            logger.warning("Could not discover licensed products: %s", str(e))
+
+        return None
+
     def create_user(self, email: str, display_name: str, send_invite: bool = True) -> Dict:
         """Create a new Atlassian user using the API with product access"""
-        headers = self.get_auth_headers()
-        if not headers:
+        session = self.get_session()
+        if not session:
             return {'success': False, 'error': 'No credentials available'}
         
         try:
             # Check if user already exists
             existing_user = self.check_user_exists(email)
             if existing_user.get('exists'):
-                print(f"User {email} already exists in Atlassian")
+                logger.info("User %s already exists in Atlassian", email)
                 
                 # Even if user exists, ensure they have all products including JSM
                 account_id = existing_user.get('accountId')
@@ -648,11 +1261,20 @@ class AtlassianManager:
                     'message': 'User already exists'
                 }
             
-            print(f"Creating user via Jira API: {email}")
+            logger.info("Creating user via Jira API: %s", email)
             
+            # Prefer the products discovered from the instance license so user
+            # creation normally succeeds on the first POST; the probe list below
+            # remains as a fallback when discovery fails
+            product_combinations = []
+
+            discovered_products = self.get_valid_products()
+            if discovered_products:
+                product_combinations.append(discovered_products)
+
             # Since the API requires products, try different combinations
             # Including JSM in various formats
-            product_combinations = [
+            product_combinations += [
                 ["jira-software"],  # This worked in your environment
                 ["jira-software", "jira-servicemanagement"],  # Add JSM
                 ["jira-software", "jira-service-management"],  # Alternative JSM
@@ -669,7 +1291,7 @@ class AtlassianManager:
             successful_products = None
             
             for attempt, products in enumerate(product_combinations, 1):
-                print(f"Attempt {attempt}: Trying with products: {products}")
+                logger.info("Attempt %s: Trying with products: %s", attempt, products)
                 
                 create_payload = {
                     "emailAddress": email,
@@ -677,37 +1299,36 @@ class AtlassianManager:
                     "products": products
                 }
                 
-                response = requests.post(
+                response = session.post(
                     f"{self.base_url}/rest/api/3/user",
-                    headers=headers,
                     json=create_payload,
-                    timeout=30
+                    timeout=REQUEST_TIMEOUT
                 )
                 
                 if response.status_code in [200, 201]:
-                    print(f"Success with products: {products}")
+                    logger.info("Success with products: %s", products)
                     successful_products = products
                     break
                 elif response.status_code == 400:
                     error_text = response.text
                     if "Invalid Jira product name" in error_text:
-                        print(f"Invalid product names: {products}")
+                        logger.warning("Invalid product names: %s", products)
                         continue
                     elif "must specify the products" in error_text:
-                        print(f"Products required but {products} not accepted")
+                        logger.info("Products required but %s not accepted", products)
                         continue
                 else:
-                    print(f"Attempt {attempt} failed: {response.status_code}")
+                    logger.warning("Attempt %s failed: %s", attempt, response.status_code)
             
             # Check if any attempt succeeded
             if response and response.status_code in [200, 201]:
-                user_data = response.json()
-                print(f"Successfully created Atlassian user: {email}")
+                user_data = json_loads(response.content)
+                logger.info("Successfully created Atlassian user: %s", email)
                 
                 # After creating user, ensure they have ALL product access including JSM
                 account_id = user_data.get('accountId') or user_data.get('key')
                 if account_id:
-                    print(f"User created with accountId: {account_id}")
+                    logger.info("User created with accountId: %s", account_id)
                     
                     # Check if JSM was included in successful products
                     jsm_included = successful_products and any(
@@ -716,12 +1337,12 @@ class AtlassianManager:
                     )
                     
                     if not jsm_included:
-                        print("JSM not included in initial creation, adding it now...")
+                        logger.info("JSM not included in initial creation, adding it now...")
                     
                     # Always ensure all products including JSM
                     self._ensure_all_product_access(account_id, email)
                 else:
-                    print("Warning: No accountId returned, user may need manual product assignment")
+                    logger.warning("Warning: No accountId returned, user may need manual product assignment")
                 
                 return {
                     'success': True,
@@ -735,7 +1356,7 @@ class AtlassianManager:
             else:
                 # All attempts failed - provide detailed error
                 error_msg = f"Failed to create user after all attempts. Last error: {response.status_code if response else 'No response'} - {response.text if response else 'No response'}"
-                print(error_msg)
+                logger.error("%s", error_msg)
                 
                 return {
                     'success': False, 
@@ -745,89 +1366,91 @@ class AtlassianManager:
                 
         except Exception as e:
             error_msg = f"Error creating Atlassian user: {str(e)}"
-            print(error_msg)
+            logger.exception("%s", error_msg)
             return {'success': False, 'error': error_msg}
     
+    def _try_add_group(self, account_id: str, group_name: str):
+        """Attempt one group add; returns (group_name, status_code, response_text)"""
+        session = self.get_session()
+
+        try:
+            response = session.post(
+                self._ep_group_user,
+                params={'groupname': group_name},
+                json={'accountId': account_id},
+                timeout=REQUEST_TIMEOUT
+            )
+            return (group_name, response.status_code, response.text)
+        except Exception as e:
+            return (group_name, None, str(e))
+
     def _ensure_all_product_access(self, account_id: str, email: str):
         """Ensure user has access to all products including JSM Customer access"""
-        headers = self.get_auth_headers()
-        if not headers:
+        session = self.get_session()
+        if not session:
             return
         
         try:
-            # Extract organization name from the base URL (e.g., Company-name from company-name.atlassian.net)
-            org_name = self.base_url.split('//')[1].split('.')[0] if self.base_url else 'Your_Company_Name'
-            
-            # Groups that provide product access
-            # Including JSM customer access groups with organization-specific naming
-            product_access_groups = [
-                "jira-software-users",
-                "confluence-users",
-                "jira-users",
-                "users",
-                # JSM Customer access groups - with organization name
-                f"jira-servicemanagement-customers-{org_name}",  # This is the correct format!
-                f"jira-service-management-customers-{org_name}",
-                f"jira-servicedesk-customers-{org_name}",
-                # Also try without org name in case
-                "jira-servicemanagement-customers",
-                "jira-service-management-customers", 
-                "jira-servicedesk-customers",
-                "service-desk-customers",
-                "servicedesk-customers",
-                "jsd-customers",
-            ]
-            
-            groups_added = []
-            jsm_added = False
-            
-            for group_name in product_access_groups:
-                try:
-                    response = requests.post(
-                        f"{self.base_url}/rest/api/3/group/user",
-                        headers=headers,
-                        params={'groupname': group_name},
-                        json={'accountId': account_id},
-                        timeout=30
-                    )
-                    
-                    if response.status_code in [200, 201]:
-                        print(f"Added {email} to product group: {group_name}")
-                        groups_added.append(group_name)
-                        if 'servicemanagement-customers' in group_name:
-                            jsm_added = True
-                            print(f" JSM Customer access granted via group: {group_name}")
-                    elif response.status_code == 400 and 'already a member' in response.text.lower():
-                        print(f"User already in group: {group_name}")
-                        groups_added.append(group_name)
-                        if 'servicemanagement-customers' in group_name:
-                            jsm_added = True
-                    elif response.status_code == 404:
-                        # Group doesn't exist, try next
+            # Candidate group names per product are built once per resolved
+            # site URL. Once one variant of a product sticks, the remaining
+            # variants can only return 404/already-member, so each product
+            # stops at its first success.
+            product_variants = self._get_product_variants()
+
+            def try_product(variants):
+                """Try variants in order until one sticks; returns the group name or None"""
+                for candidate in variants:
+                    group_name, status_code, text = self._try_add_group(account_id, candidate)
+
+                    if status_code in [200, 201]:
+                        logger.info("Added %s to product group: %s", email, group_name)
+                        return group_name
+                    elif status_code == 400 and 'already a member' in text.lower():
+                        logger.info("User already in group: %s", group_name)
+                        return group_name
+                    elif status_code == 404:
+                        # Group doesn't exist, try next variant
                         continue
+                    elif status_code is None:
+                        logger.warning("Error adding to %s: %s", group_name, text)
                     else:
-                        print(f"Could not add to {group_name}: {response.status_code}")
-                        
-                except Exception as e:
-                    print(f"Error adding to {group_name}: {str(e)}")
+                        logger.warning("Could not add to %s: %s", group_name, status_code)
+
+                return None
+
+            # Products are independent so they still run concurrently, but the
+            # variant probing within each product is sequential with early exit
+            with ThreadPoolExecutor(max_workers=len(product_variants)) as executor:
+                added = dict(zip(
+                    product_variants,
+                    executor.map(try_product, product_variants.values())
+                ))
+
+            groups_added = [name for name in added.values() if name]
+            jsm_added = bool(added.get('jsm-customer'))
+
+            if jsm_added:
+                logger.info(" JSM Customer access granted via group: %s", added['jsm-customer'])
             
             # If JSM customer group was not found, try other methods
             if not jsm_added:
-                print(f"JSM customer group not added yet, attempting alternative methods...")
+                logger.info("JSM customer group not added yet, attempting alternative methods...")
                 self._add_jsm_product_access(account_id, email)
             else:
-                print(f"JSM Customer access successfully granted for {email}")
+                logger.info("JSM Customer access successfully granted for %s", email)
             
-            # Also call the original method for backward compatibility
-            self._ensure_product_access(account_id, email)
+            # Only fall back to the legacy prober for products that weren't
+            # satisfied above - it would just re-try the same group names
+            if not added.get('jira-software') or not added.get('confluence'):
+                self._ensure_product_access(account_id, email)
                     
         except Exception as e:
-            print(f"Error ensuring all product access: {str(e)}")
+            logger.warning("Error ensuring all product access: %s", str(e))
     
     def _add_jsm_product_access(self, account_id: str, email: str):
         """Specifically add JSM product access to user"""
-        headers = self.get_auth_headers()
-        if not headers:
+        session = self.get_session()
+        if not session:
             return
         
         try:
@@ -850,33 +1473,31 @@ class AtlassianManager:
                         "products": [product_key]
                     }
                     
-                    response = requests.patch(
+                    response = session.patch(
                         f"{self.base_url}/rest/api/3/user?accountId={account_id}",
-                        headers=headers,
                         json=update_payload,
-                        timeout=30
+                        timeout=REQUEST_TIMEOUT
                     )
                     
                     if response.status_code in [200, 204]:
-                        print(f"Successfully added JSM product access with key: {product_key}")
+                        logger.info("Successfully added JSM product access with key: %s", product_key)
                         return True
                     else:
-                        print(f"Could not add JSM with key {product_key}: {response.status_code}")
+                        logger.warning("Could not add JSM with key %s: %s", product_key, response.status_code)
                         
                 except Exception as e:
-                    print(f"Error adding JSM product {product_key}: {str(e)}")
+                    logger.warning("Error adding JSM product %s: %s", product_key, str(e))
             
             # Approach 2: Create a service desk customer (this often auto-grants JSM access)
             try:
                 # Get the first service desk project
-                sd_response = requests.get(
-                    f"{self.base_url}/rest/servicedeskapi/servicedesk",
-                    headers=headers,
-                    timeout=30
+                sd_response = session.get(
+                    self._ep_servicedesk,
+                    timeout=REQUEST_TIMEOUT
                 )
                 
                 if sd_response.status_code == 200:
-                    service_desks = sd_response.json().get('values', [])
+                    service_desks = json_loads(sd_response.content).get('values', [])
                     if service_desks:
                         first_sd = service_desks[0]
                         sd_id = first_sd.get('id')
@@ -886,127 +1507,131 @@ class AtlassianManager:
                             "accountIds": [account_id]
                         }
                         
-                        add_customer_response = requests.post(
-                            f"{self.base_url}/rest/servicedeskapi/servicedesk/{sd_id}/customer",
-                            headers=headers,
+                        add_customer_response = session.post(
+                            f"{self._ep_servicedesk}/{sd_id}/customer",
                             json=customer_payload,
-                            timeout=30
+                            timeout=REQUEST_TIMEOUT
                         )
                         
                         if add_customer_response.status_code in [200, 204]:
-                            print(f"Added user as customer to service desk {sd_id}")
+                            logger.info("Added user as customer to service desk %s", sd_id)
                             return True
                         else:
-                            print(f"Could not add as service desk customer: {add_customer_response.status_code}")
+                            logger.warning("Could not add as service desk customer: %s", add_customer_response.status_code)
                             
             except Exception as e:
-                print(f"Error adding as service desk customer: {str(e)}")
+                logger.warning("Error adding as service desk customer: %s", str(e))
             
-            print("WARNING: Could not add JSM product access through any method")
+            logger.warning("WARNING: Could not add JSM product access through any method")
             return False
             
         except Exception as e:
-            print(f"Error in JSM product access: {str(e)}")
+            logger.warning("Error in JSM product access: %s", str(e))
             return False
     
     def _ensure_product_access(self, account_id: str, email: str):
         """Ensure user has access to Jira and Confluence products"""
-        headers = self.get_auth_headers()
-        if not headers:
+        session = self.get_session()
+        if not session:
             return
         
         try:
-            # Add user to default product access groups
-            # Try multiple group name variations as they differ between instances
-            default_groups_variations = [
-                ["jira-software-users", "confluence-users"],  # Standard names
-                ["jira-users", "confluence-users"],  # Alternative names
-                ["users", "confluence"],  # Simple names
-                ["jira", "wiki-users"],  # Legacy names
-            ]
-            
-            groups_added = []
-            
-            for group_set in default_groups_variations:
-                for group_name in group_set:
-                    if any(g in group_name for g in groups_added):
-                        continue  # Skip if we already added a similar group
-                    
-                    try:
-                        # Try to add user to product access group
-                        response = requests.post(
-                            f"{self.base_url}/rest/api/3/group/user",
-                            headers=headers,
-                            params={'groupname': group_name},
-                            json={'accountId': account_id},
-                            timeout=30
-                        )
-                        
-                        if response.status_code in [200, 201]:
-                            print(f"Added {email} to product group: {group_name}")
-                            groups_added.append(group_name)
-                        elif response.status_code == 400 and 'already a member' in response.text.lower():
-                            print(f"User already in group: {group_name}")
-                            groups_added.append(group_name)
-                        elif response.status_code == 404:
-                            print(f"Group {group_name} not found, trying next...")
-                        else:
-                            print(f"Could not add to {group_name}: {response.status_code}")
-                                
-                    except Exception as e:
-                        print(f"Error adding to {group_name}: {str(e)}")
-                
-                # If we successfully added to at least one Jira and one Confluence group, we're done
-                if any('jira' in g.lower() for g in groups_added) and any('confluence' in g.lower() for g in groups_added):
-                    print(f"Successfully ensured product access for {email}")
-                    break
-                    
+            # Candidate group names per product, ordered most-likely-first -
+            # names differ between instances. Stop calling out for a product as
+            # soon as one of its variants sticks.
+            product_group_variants = {
+                'jira': ['jira-software-users', 'jira-users', 'users', 'jira'],
+                'confluence': ['confluence-users', 'confluence', 'wiki-users'],
+            }
+
+            have = {'jira': False, 'confluence': False}
+
+            for product, variants in product_group_variants.items():
+                for group_name in variants:
+                    if have[product]:
+                        break
+
+                    group_name, status_code, text = self._try_add_group(account_id, group_name)
+
+                    if status_code in [200, 201]:
+                        logger.info("Added %s to product group: %s", email, group_name)
+                        have[product] = True
+                    elif status_code == 400 and 'already a member' in text.lower():
+                        logger.info("User already in group: %s", group_name)
+                        have[product] = True
+                    elif status_code == 404:
+                        logger.warning("Group %s not found, trying next...", group_name)
+                    elif status_code is None:
+                        logger.warning("Error adding to %s: %s", group_name, text)
+                    else:
+                        logger.warning("Could not add to %s: %s", group_name, status_code)
+
+            if all(have.values()):
+                logger.info("Successfully ensured product access for %s", email)
+
         except Exception as e:
-            print(f"Error ensuring product access: {str(e)}")
+            logger.warning("Error ensuring product access: %s", str(e))
     
+    def _check_membership(self, group, account_id: str) -> Optional[Dict]:
+        """Check whether the account is a member of one group (fallback scan)"""
+        group_name = group.get('name')
+        if not group_name:
+            return None
+
+        try:
+            member_check = self.get_session().get(
+                f"{self._ep_group_member}?groupname={group_name}&accountId={account_id}",
+                timeout=(5, 5)
+            )
+
+            if member_check.status_code == 200 and json_loads(member_check.content):
+                return {'name': group_name, 'groupId': group.get('groupId')}
+        except Exception as e:
+            logger.warning("Membership check failed for %s: %s", group_name, str(e))
+
+        return None
+
     def get_user_groups(self, user_email: str) -> List[Dict]:
         """Get all groups a user belongs to in Atlassian/Jira"""
-        headers = self.get_auth_headers()
-        if not headers:
+        session = self.get_session()
+        if not session:
             return []
         
         try:
             # First get user details
             user_info = self.check_user_exists(user_email)
             if not user_info.get('exists'):
-                print(f"User {user_email} not found")
+                logger.warning("User %s not found", user_email)
                 return []
             
             account_id = user_info['accountId']
-            print(f"Getting groups for user {user_email} (accountId: {account_id})")
+            logger.info("Getting groups for user %s (accountId: %s)", user_email, account_id)
             
             # Method 1: Try the groups endpoint directly (most reliable)
             try:
-                groups_response = requests.get(
-                    f"{self.base_url}/rest/api/3/user/groups?accountId={account_id}",
-                    headers=headers,
-                    timeout=30
+                groups_response = session.get(
+                    f"{self._ep_user_groups}?accountId={account_id}",
+                    timeout=REQUEST_TIMEOUT
                 )
                 
                 if groups_response.status_code == 200:
-                    groups = groups_response.json()
+                    groups = json_loads(groups_response.content)
                     if groups and len(groups) > 0:
                         group_list = [{'name': g.get('name'), 'groupId': g.get('groupId')} for g in groups]
-                        print(f"Found {len(group_list)} groups via direct endpoint")
+                        logger.info("Found %s groups via direct endpoint", len(group_list))
                         return group_list
             except Exception as e:
-                print(f"Direct groups endpoint failed: {str(e)}")
+                logger.warning("Direct groups endpoint failed: %s", str(e))
             
             # Method 2: Try the bulk endpoint with expand parameter
             try:
-                response = requests.get(
+                response = session.get(
                     f"{self.base_url}/rest/api/3/user/bulk?accountId={account_id}&expand=groups",
-                    headers=headers,
-                    timeout=30
+                    timeout=REQUEST_TIMEOUT
                 )
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = json_loads(response.content)
                     if 'values' in data and len(data['values']) > 0:
                         user_data = data['values'][0]
                         groups = user_data.get('groups', {}).get('items', [])
@@ -1018,257 +1643,286 @@ class AtlassianManager:
                                     'name': group.get('name'),
                                     'groupId': group.get('groupId')
                                 })
-                            print(f"Found {len(group_list)} groups via bulk endpoint")
+                            logger.info("Found %s groups via bulk endpoint", len(group_list))
                             return group_list
             except Exception as e:
-                print(f"Bulk endpoint failed: {str(e)}")
+                logger.warning("Bulk endpoint failed: %s", str(e))
             
             # Method 3: Try searching for groups and checking membership
             try:
-                # Get all groups in the instance
-                all_groups_response = requests.get(
-                    f"{self.base_url}/rest/api/3/group/bulk",
-                    headers=headers,
-                    timeout=30
-                )
-                
-                if all_groups_response.status_code == 200:
-                    all_groups = all_groups_response.json().get('values', [])
-                    user_groups = []
-                    
-                    # Check each group for user membership
-                    for group in all_groups[:50]:  # Limit to first 50 to avoid timeout
-                        group_name = group.get('name')
-                        if not group_name:
-                            continue
-                        
-                        # Check if user is in this group
-                        member_check = requests.get(
-                            f"{self.base_url}/rest/api/3/group/member?groupname={group_name}&accountId={account_id}",
-                            headers=headers,
-                            timeout=5
-                        )
-                        
-                        if member_check.status_code == 200:
-                            is_member = member_check.json()
-                            if is_member:
-                                user_groups.append({
-                                    'name': group_name,
-                                    'groupId': group.get('groupId')
-                                })
-                    
+                # Get all groups in the instance - reuse the warm-container
+                # copy when it is fresh enough
+                if _atlassian_group_list['groups'] is not None and \
+                        time.time() - _atlassian_group_list['fetched_at'] < DIRECTORY_LIST_TTL_SECONDS:
+                    all_groups = _atlassian_group_list['groups']
+                else:
+                    all_groups = []
+                    all_groups_response = session.get(
+                        f"{self.base_url}/rest/api/3/group/bulk",
+                        timeout=REQUEST_TIMEOUT
+                    )
+
+                    if all_groups_response.status_code == 200:
+                        all_groups = json_loads(all_groups_response.content).get('values', [])
+                        _atlassian_group_list['groups'] = all_groups
+                        _atlassian_group_list['fetched_at'] = time.time()
+
+                if all_groups:
+                    # Check membership in parallel - sequentially this was up
+                    # to 50 round trips (limit kept at 50 to avoid timeout)
+                    with ThreadPoolExecutor(max_workers=16) as executor:
+                        user_groups = [
+                            result for result in executor.map(
+                                lambda group: self._check_membership(group, account_id),
+                                all_groups[:50]
+                            )
+                            if result
+                        ]
+
                     if user_groups:
-                        print(f"Found {len(user_groups)} groups via membership check")
+                        logger.info("Found %s groups via membership check", len(user_groups))
                         return user_groups
             except Exception as e:
-                print(f"Group membership check failed: {str(e)}")
+                logger.warning("Group membership check failed: %s", str(e))
             
             # If all methods fail, return empty list
-            print(f"WARNING: Could not retrieve groups for {user_email}. User may not be in any groups or API access may be limited.")
+            logger.warning("WARNING: Could not retrieve groups for %s. User may not be in any groups or API access may be limited.", user_email)
             return []
             
         except Exception as e:
-            print(f"Error getting user groups: {str(e)}")
+            logger.warning("Error getting user groups: %s", str(e))
             return []
     
-    def add_user_to_group(self, user_email: str, group_name: str) -> bool:
+    def add_user_to_group(self, user_email: str, group_name: str, account_id: Optional[str] = None) -> bool:
         """Add user to a Jira/Confluence group"""
-        headers = self.get_auth_headers()
-        if not headers:
-            print(f"No auth headers available for adding to group {group_name}")
+        session = self.get_session()
+        if not session:
+            logger.warning("No auth session available for adding to group %s", group_name)
             return False
         
         try:
-            # Get user account ID
-            user_info = self.check_user_exists(user_email)
-            if not user_info.get('exists'):
-                print(f"User {user_email} not found when trying to add to group {group_name}")
-                return False
-            
-            account_id = user_info['accountId']
-            print(f"Attempting to add user {user_email} (ID: {account_id}) to group: {group_name}")
+            # Look up the account ID only when the caller didn't supply it
+            if not account_id:
+                user_info = self.check_user_exists(user_email)
+                if not user_info.get('exists'):
+                    logger.warning("User %s not found when trying to add to group %s", user_email, group_name)
+                    return False
+
+                account_id = user_info['accountId']
+
+            logger.info("Attempting to add user %s (ID: %s) to group: %s", user_email, account_id, group_name)
             
             # IMPORTANT: Skip the membership check as it's giving false positives
             # The GET /group/member endpoint seems to be unreliable
             # Instead, we'll just try to add the user and handle the response
             
-            print(f"Sending POST request to add user to {group_name} (skipping membership check)")
+            logger.info("Sending POST request to add user to %s (skipping membership check)", group_name)
             
             # Add user to group using POST request
-            response = requests.post(
-                f"{self.base_url}/rest/api/3/group/user",
-                headers=headers,
+            response = session.post(
+                self._ep_group_user,
                 params={'groupname': group_name},
                 json={'accountId': account_id},
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
-            print(f"Add to group response for {group_name}: Status={response.status_code}")
+            logger.info("Add to group response for %s: Status=%s", group_name, response.status_code)
             
             if response.status_code in [200, 201]:
-                print(f" Successfully added {user_email} to group: {group_name}")
+                logger.info(" Successfully added %s to group: %s", user_email, group_name)
                 return True
             elif response.status_code == 204:
                 # 204 No Content often means success
-                print(f" Added {user_email} to group (204 response): {group_name}")
+                logger.info(" Added %s to group (204 response): %s", user_email, group_name)
                 return True
             elif response.status_code == 400:
-                # Parse the error message
-                error_text = response.text
-                print(f"400 error for group {group_name}: {error_text[:500]}")
-                
-                error_lower = error_text.lower()
-                if 'already a member' in error_lower or 'already in' in error_lower or 'user is already a member' in error_lower:
-                    print(f"User already in group (per API response): {group_name}")
+                # Classify via the structured errorMessages when present,
+                # falling back to the raw body
+                logger.warning("400 error for group %s: %s", group_name, _body_snippet(response))
+
+                try:
+                    error_messages = json_loads(response.content).get('errorMessages', [])
+                except Exception:
+                    error_messages = []
+                errors = ' '.join(error_messages) or response.text
+
+                if _ERR_ALREADY_MEMBER_RE.search(errors):
+                    logger.info("User already in group (per API response): %s", group_name)
                     return True
-                elif 'cannot add users to' in error_lower or 'cannot be modified' in error_lower:
-                    print(f"Cannot add users to group {group_name} - may be a system/restricted group")
+                elif _ERR_RESTRICTED_RE.search(errors):
+                    logger.warning("Cannot add users to group %s - may be a system/restricted group", group_name)
                     return False
-                elif 'does not exist' in error_lower or 'group not found' in error_lower:
-                    print(f"Group {group_name} does not exist")
+                elif _ERR_GROUP_MISSING_RE.search(errors):
+                    logger.info("Group %s does not exist", group_name)
                     return False
-                elif 'not found' in error_lower:
-                    print(f"Group or user not found for: {group_name}")
+                elif _ERR_NOT_FOUND_RE.search(errors):
+                    logger.warning("Group or user not found for: %s", group_name)
                     return False
-                elif 'permission' in error_lower or 'not authorized' in error_lower:
-                    print(f"No permission to add users to group: {group_name}")
+                elif _ERR_PERMISSION_RE.search(errors):
+                    logger.info("No permission to add users to group: %s", group_name)
                     return False
                 else:
-                    print(f"Unknown 400 error for group {group_name}. Full error: {error_text}")
-                    # Try to parse JSON error if possible
-                    try:
-                        import json
-                        error_json = json.loads(error_text)
-                        if 'errorMessages' in error_json:
-                            for msg in error_json['errorMessages']:
-                                print(f"  Error message: {msg}")
-                    except:
-                        pass
+                    logger.warning("Unknown 400 error for group %s. Full error: %s", group_name, response.text)
+                    for msg in error_messages:
+                        logger.warning("  Error message: %s", msg)
                     return False
             elif response.status_code == 403:
-                print(f"403 Permission denied to add users to group: {group_name}")
+                logger.warning("403 Permission denied to add users to group: %s", group_name)
                 # Get more details about the permission error
-                print(f"Error details: {response.text[:500]}")
+                logger.debug("Error details: %s", _body_snippet(response))
                 return False
             elif response.status_code == 404:
-                error_text = response.text
-                print(f"404 error - Group not found: {group_name}")
-                print(f"Error details: {error_text[:500]}")
+                logger.warning("404 error - Group not found: %s", group_name)
+                logger.debug("Error details: %s", _body_snippet(response))
                 return False
             else:
-                print(f"Unexpected response {response.status_code} for group {group_name}")
-                print(f"Response body: {response.text[:500]}")
+                logger.info("Unexpected response %s for group %s", response.status_code, group_name)
+                logger.debug("Response body: %s", _body_snippet(response))
                 return False
                 
-        except Exception as e:
-            print(f"Exception while adding user to group {group_name}: {str(e)}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Exception while adding user to group %s", group_name)
             return False
     
+    def _get_project_roles(self, project):
+        """Fetch the role map for one project"""
+        try:
+            response = self.get_session().get(
+                f"{self.base_url}/rest/api/3/project/{project['key']}/role",
+                timeout=REQUEST_TIMEOUT
+            )
+
+            if response.status_code == 200:
+                return (project, json_loads(response.content))
+        except Exception as e:
+            logger.warning("Error getting roles for project %s: %s", project.get('key'), str(e))
+
+        return (project, {})
+
+    def _get_role_detail(self, task, account_id: str) -> Optional[Dict]:
+        """Fetch one role's actors and return the role entry if the user holds it"""
+        project_key, project_name, role_id, role_url = task
+
+        try:
+            response = self.get_session().get(role_url, timeout=REQUEST_TIMEOUT)
+
+            if response.status_code == 200:
+                role_data = json_loads(response.content)
+
+                for actor in role_data.get('actors', []):
+                    if actor.get('actorUser', {}).get('accountId') == account_id:
+                        return {
+                            'project_key': project_key,
+                            'project_name': project_name,
+                            'role_name': role_data.get('name'),
+                            'role_id': role_id
+                        }
+        except Exception as e:
+            logger.warning("Error getting role detail for %s/%s: %s", project_key, role_id, str(e))
+
+        return None
+
     def get_user_project_roles(self, user_email: str) -> List[Dict]:
         """Get all project roles for a user"""
-        headers = self.get_auth_headers()
-        if not headers:
+        session = self.get_session()
+        if not session:
             return []
-        
+
         try:
             # Get user account ID
             user_info = self.check_user_exists(user_email)
             if not user_info.get('exists'):
                 return []
-            
+
             account_id = user_info['accountId']
-            
-            # Get all projects
-            projects_response = requests.get(
-                f"{self.base_url}/rest/api/3/project/search?expand=lead",
-                headers=headers,
-                timeout=30
-            )
-            
-            if projects_response.status_code != 200:
-                return []
-            
-            projects = projects_response.json().get('values', [])
-            user_roles = []
-            
-            # Check each project for user's roles
-            for project in projects:
-                project_key = project['key']
-                project_name = project['name']
-                
-                # Get project roles
-                roles_response = requests.get(
-                    f"{self.base_url}/rest/api/3/project/{project_key}/role",
-                    headers=headers,
-                    timeout=30
-                )
-                
-                if roles_response.status_code == 200:
-                    roles = roles_response.json()
-                    
-                    # Check each role for the user
-                    for role_id, role_url in roles.items():
-                        role_detail_response = requests.get(
-                            role_url,
-                            headers=headers,
-                            timeout=30
-                        )
-                        
-                        if role_detail_response.status_code == 200:
-                            role_data = role_detail_response.json()
-                            actors = role_data.get('actors', [])
-                            
-                            # Check if user is in this role
-                            for actor in actors:
-                                if actor.get('actorUser', {}).get('accountId') == account_id:
-                                    user_roles.append({
-                                        'project_key': project_key,
-                                        'project_name': project_name,
-                                        'role_name': role_data.get('name'),
-                                        'role_id': role_id
-                                    })
-                                    break
-            
-            print(f"Found {len(user_roles)} project roles for {user_email}")
+
+            # Page through all projects - the search endpoint returns at most
+            # 50 per page and the single GET silently truncated beyond that.
+            # The project list barely changes, so warm containers reuse it.
+            if _atlassian_project_list['projects'] is not None and \
+                    time.time() - _atlassian_project_list['fetched_at'] < DIRECTORY_LIST_TTL_SECONDS:
+                projects = _atlassian_project_list['projects']
+            else:
+                projects = []
+                start_at = 0
+
+                while True:
+                    projects_response = session.get(
+                        f"{self.base_url}/rest/api/3/project/search?startAt={start_at}&maxResults=50",
+                        timeout=REQUEST_TIMEOUT
+                    )
+
+                    if projects_response.status_code != 200:
+                        break
+
+                    page = json_loads(projects_response.content)
+                    values = page.get('values', [])
+                    projects.extend(values)
+
+                    if page.get('isLast', True) or not values:
+                        break
+                    start_at += len(values)
+
+                _atlassian_project_list['projects'] = projects
+                _atlassian_project_list['fetched_at'] = time.time()
+
+            # Fan out the per-project role maps and then the role-detail reads;
+            # sequentially this was 1 + P + P*R round trips
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                project_roles = list(executor.map(self._get_project_roles, projects))
+
+                tasks = [
+                    (project['key'], project['name'], role_id, role_url)
+                    for project, roles in project_roles
+                    for role_id, role_url in roles.items()
+                ]
+
+                user_roles = [
+                    role for role in executor.map(
+                        lambda task: self._get_role_detail(task, account_id),
+                        tasks
+                    )
+                    if role
+                ]
+
+            logger.info("Found %s project roles for %s", len(user_roles), user_email)
             return user_roles
-            
+
         except Exception as e:
-            print(f"Error getting project roles: {str(e)}")
+            logger.warning("Error getting project roles: %s", str(e))
             return []
     
-    def add_user_to_project_role(self, user_email: str, project_key: str, role_id: str) -> bool:
+    def add_user_to_project_role(self, user_email: str, project_key: str, role_id: str, account_id: Optional[str] = None) -> bool:
         """Add user to a specific project role"""
-        headers = self.get_auth_headers()
-        if not headers:
+        session = self.get_session()
+        if not session:
             return False
-        
+
         try:
-            # Get user account ID
-            user_info = self.check_user_exists(user_email)
-            if not user_info.get('exists'):
-                return False
-            
-            account_id = user_info['accountId']
+            # Look up the account ID only when the caller didn't supply it
+            if not account_id:
+                user_info = self.check_user_exists(user_email)
+                if not user_info.get('exists'):
+                    return False
+
+                account_id = user_info['accountId']
             
             # Add user to project role
-            response = requests.post(
+            response = session.post(
                 f"{self.base_url}/rest/api/3/project/{project_key}/role/{role_id}",
-                headers=headers,
                 json={'user': [account_id]},
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code in [200, 201]:
-                print(f"Added {user_email} to role {role_id} in project {project_key}")
+                logger.info("Added %s to role %s in project %s", user_email, role_id, project_key)
                 return True
             else:
-                print(f"Failed to add to project role: {response.status_code}")
+                logger.warning("Failed to add to project role: %s", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"Error adding to project role: {str(e)}")
+            logger.warning("Error adding to project role: %s", str(e))
             return False
     
     def replicate_atlassian_access(self, source_user_email: str, target_user_email: str, target_display_name: str) -> Dict:
@@ -1287,7 +1941,7 @@ class AtlassianManager:
         }
         
         try:
-            print(f"Starting Atlassian access replication from {source_user_email} to {target_user_email}")
+            logger.info("Starting Atlassian access replication from %s to %s", source_user_email, target_user_email)
             
             # Step 1: Create target user if doesn't exist
             user_result = self.create_user(target_user_email, target_display_name)
@@ -1300,153 +1954,205 @@ class AtlassianManager:
             # IMPORTANT: Cache the account ID from creation result
             target_account_id = user_result.get('accountId')
             if not target_account_id:
-                print("WARNING: No accountId returned from user creation, attempting to look up...")
+                logger.warning("WARNING: No accountId returned from user creation, attempting to look up...")
                 # Try to get the account ID
                 target_user_info = self.check_user_exists(target_user_email)
                 if target_user_info.get('exists'):
                     target_account_id = target_user_info.get('accountId')
                 else:
-                    print(f"ERROR: Cannot find account ID for {target_user_email}")
+                    logger.warning("ERROR: Cannot find account ID for %s", target_user_email)
                     results['summary'] = "User created but cannot find account ID for group operations"
                     return results
             
             results['account_id'] = target_account_id
-            print(f"Target user account ID: {target_account_id}")
+            logger.info("Target user account ID: %s", target_account_id)
             
             # Step 2: Get source user's groups with improved method
-            print(f"Getting groups for source user: {source_user_email}")
+            logger.info("Getting groups for source user: %s", source_user_email)
             
             # First, ensure source user exists and get their account ID
             source_user_info = self.check_user_exists(source_user_email)
             if not source_user_info.get('exists'):
-                print(f"Source user {source_user_email} not found in Atlassian")
+                logger.warning("Source user %s not found in Atlassian", source_user_email)
                 results['summary'] = f"Source user not found for group replication"
                 return results
             
             source_account_id = source_user_info.get('accountId')
-            print(f"Source user accountId: {source_account_id}")
+            logger.info("Source user accountId: %s", source_account_id)
             
             # Try multiple methods to get groups
             source_groups = []
-            
+            session = self.get_session()
+
             # Method 1: Direct API call
             try:
-                headers = self.get_auth_headers()
-                response = requests.get(
-                    f"{self.base_url}/rest/api/3/user/groups?accountId={source_account_id}",
-                    headers=headers,
-                    timeout=30
+                response = session.get(
+                    f"{self._ep_user_groups}?accountId={source_account_id}",
+                    timeout=REQUEST_TIMEOUT
                 )
                 
                 if response.status_code == 200:
-                    groups_data = response.json()
+                    groups_data = json_loads(response.content)
                     if groups_data:
                         source_groups = [{'name': g.get('name', g.get('groupName')), 'groupId': g.get('groupId')} for g in groups_data]
-                        print(f"Found {len(source_groups)} groups via direct API")
+                        logger.info("Found %s groups via direct API", len(source_groups))
                 else:
-                    print(f"Groups API returned {response.status_code}: {response.text[:200]}")
+                    logger.info("Groups API returned %s: %s", response.status_code, _body_snippet(response, 200))
             except Exception as e:
-                print(f"Error getting groups via API: {str(e)}")
+                logger.warning("Error getting groups via API: %s", str(e))
             
             # Method 2: If no groups found, try alternative endpoint
             if not source_groups:
                 try:
                     # Try getting all groups and checking membership
-                    all_groups_response = requests.get(
+                    all_groups_response = session.get(
                         f"{self.base_url}/rest/api/3/groups/picker?accountId={source_account_id}&maxResults=100",
-                        headers=headers,
-                        timeout=30
+                        timeout=REQUEST_TIMEOUT
                     )
                     
                     if all_groups_response.status_code == 200:
-                        picker_data = all_groups_response.json()
+                        picker_data = json_loads(all_groups_response.content)
                         groups = picker_data.get('groups', [])
                         source_groups = [{'name': g.get('name'), 'groupId': g.get('groupId')} for g in groups]
-                        print(f"Found {len(source_groups)} groups via picker API")
+                        logger.info("Found %s groups via picker API", len(source_groups))
                 except Exception as e:
-                    print(f"Error getting groups via picker: {str(e)}")
+                    logger.warning("Error getting groups via picker: %s", str(e))
             
-            print(f"Total groups found for source user: {len(source_groups)}")
+            # Dedupe by groupId (falling back to name) - duplicate entries
+            # would each cost a full group-add round trip downstream
+            seen = set()
+            deduped_groups = []
+            for group in source_groups:
+                key = group.get('groupId') or (group.get('name') or '').lower()
+                if key and key in seen:
+                    continue
+                seen.add(key)
+                deduped_groups.append(group)
+            source_groups = deduped_groups
+
+            logger.info("Total groups found for source user: %s", len(source_groups))
             
             # Step 3: Replicate group memberships using cached account ID
             if source_groups:
-                # Groups to skip - admin groups and system groups that shouldn't be replicated
-                skip_groups = [
-                    'administrators',
-                    'site-admins',
-                    'jira-admins',
-                    'confluence-admins',
-                    'system-administrators',
-                    'trusted-users',
-                    'users',  # Default users group
-                    'anyone',
-                    'anonymous'
-                ]
-                
-                # Also skip groups with certain patterns
-                skip_patterns = [
-                    '-admins',
-                    '-administrators',
-                    'admin-'
-                ]
-                
+                # Fetch the target's current groups once - on re-runs of a
+                # partial replication most adds would otherwise burn a round
+                # trip on an "already a member" 400
+                target_group_names = {
+                    g['name'] for g in self.get_user_groups(target_user_email) if g.get('name')
+                }
+
+                groups_to_add = []
+
                 for group in source_groups:
                     group_name = group.get('name')
                     if not group_name:
                         continue
-                    
+
                     # Check if this is an admin/system group that should be skipped
                     group_lower = group_name.lower()
-                    
+
                     # Skip if it's in the skip list
-                    if group_lower in skip_groups:
+                    if group_lower in REPLICATION_SKIP_GROUPS:
                         results['groups_skipped'].append(group_name)
-                        print(f"Skipping admin/system group: {group_name}")
+                        logger.debug("Skipping admin/system group: %s", group_name)
                         continue
-                    
+
                     # Skip if it matches admin patterns
-                    if any(pattern in group_lower for pattern in skip_patterns):
+                    if REPLICATION_SKIP_RE.search(group_lower):
                         results['groups_skipped'].append(group_name)
-                        print(f"Skipping admin group: {group_name}")
+                        logger.debug("Skipping admin group: %s", group_name)
                         continue
-                    
+
                     # Skip JSM customer groups as they're already handled
                     if 'servicemanagement-customers' in group_lower:
                         results['groups_skipped'].append(group_name)
-                        print(f"Skipping JSM customer group (already handled): {group_name}")
+                        logger.debug("Skipping JSM customer group (already handled): %s", group_name)
                         continue
-                    
-                    # Try to add user to the group using the CACHED account ID
-                    if self.add_user_to_group_with_id(target_account_id, target_user_email, group_name):
+
+                    # Already on the target user - no POST needed
+                    if group_name in target_group_names:
                         results['groups_added'].append(group_name)
-                        print(f" Added to group: {group_name}")
-                    else:
-                        results['groups_failed'].append(group_name)
-                        print(f" Failed to add to group: {group_name}")
+                        logger.debug("Target already in group: %s", group_name)
+                        continue
+
+                    groups_to_add.append(group_name)
+
+                # Add to the remaining groups in parallel using the CACHED
+                # account ID - each add is an independent Jira call
+                if groups_to_add:
+                    with ThreadPoolExecutor(max_workers=8) as executor:
+                        outcomes = executor.map(
+                            lambda group_name: (
+                                group_name,
+                                self.add_user_to_group_with_id(target_account_id, target_user_email, group_name)
+                            ),
+                            groups_to_add
+                        )
+
+                        for group_name, success in outcomes:
+                            if success:
+                                results['groups_added'].append(group_name)
+                                logger.debug("Added to group: %s", group_name)
+                            else:
+                                results['groups_failed'].append(group_name)
+                                logger.warning("Failed to add to group: %s", group_name)
+
+                # One structured summary instead of 3-5 log writes per group
+                logger.info(
+                    "Group replication for %s: %s added, %s failed, %s skipped%s",
+                    target_user_email,
+                    len(results['groups_added']),
+                    len(results['groups_failed']),
+                    len(results['groups_skipped']),
+                    f" (failed: {', '.join(results['groups_failed'])})" if results['groups_failed'] else ''
+                )
             else:
-                print("WARNING: No groups found for source user - they may not be in any groups")
+                logger.warning("WARNING: No groups found for source user - they may not be in any groups")
             
             # Step 4: Get source user's project roles (keeping existing logic)
             source_roles = self.get_user_project_roles(source_user_email)
-            print(f"Found {len(source_roles)} project roles for source user")
+            logger.info("Found %s project roles for source user", len(source_roles))
             
-            # Step 5: Replicate project roles
+            # Step 5: Replicate project roles. Jira's role endpoint takes one
+            # (project, role) pair per POST, so dedupe the pairs up front and
+            # fan the independent POSTs out over worker threads
+            roles_to_add = []
+            seen_roles = set()
+
             for role in source_roles:
                 role_desc = f"{role['project_name']} - {role['role_name']}"
                 # Skip admin roles
                 if 'admin' in role['role_name'].lower():
                     results['groups_skipped'].append(role_desc)
-                    print(f"Skipping admin role: {role_desc}")
+                    logger.info("Skipping admin role: %s", role_desc)
                     continue
-                    
-                if self.add_user_to_project_role(
-                    target_user_email, 
-                    role['project_key'], 
-                    role['role_id']
-                ):
-                    results['projects_added'].append(role_desc)
-                else:
-                    results['projects_failed'].append(role_desc)
+
+                role_key = (role['project_key'], role['role_id'])
+                if role_key in seen_roles:
+                    continue
+                seen_roles.add(role_key)
+                roles_to_add.append((role_desc, role))
+
+            if roles_to_add:
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    outcomes = executor.map(
+                        lambda item: (
+                            item[0],
+                            self.add_user_to_project_role(
+                                target_user_email,
+                                item[1]['project_key'],
+                                item[1]['role_id'],
+                                account_id=target_account_id
+                            )
+                        ),
+                        roles_to_add
+                    )
+
+                    for role_desc, success in outcomes:
+                        if success:
+                            results['projects_added'].append(role_desc)
+                        else:
+                            results['projects_failed'].append(role_desc)
             
             # Generate summary
             results['summary'] = (
@@ -1455,125 +2161,177 @@ class AtlassianManager:
                 f"Project roles: {len(results['projects_added'])} added, {len(results['projects_failed'])} failed."
             )
             
-            print(f"Atlassian replication completed: {results['summary']}")
+            logger.info("Atlassian replication completed: %s", results['summary'])
             return results
             
         except Exception as e:
             error_msg = f"Error in Atlassian replication: {str(e)}"
-            print(error_msg)
+            logger.exception("%s", error_msg)
             results['summary'] = error_msg
             results['error'] = str(e)
             return results
     
     def add_user_to_group_with_id(self, account_id: str, user_email: str, group_name: str) -> bool:
         """Add user to group using pre-fetched account ID"""
-        headers = self.get_auth_headers()
-        if not headers:
-            print(f"No auth headers available for adding to group {group_name}")
+        session = self.get_session()
+        if not session:
+            logger.warning("No auth session available for adding to group %s", group_name)
             return False
         
         try:
-            print(f"Attempting to add user {user_email} (ID: {account_id}) to group: {group_name}")
+            logger.debug("Attempting to add user %s (ID: %s) to group: %s", user_email, account_id, group_name)
             
-            # Skip membership check and directly try to add
-            print(f"Sending POST request to add user to {group_name}")
-            
-            response = requests.post(
-                f"{self.base_url}/rest/api/3/group/user",
-                headers=headers,
+            response = session.post(
+                self._ep_group_user,
                 params={'groupname': group_name},
                 json={'accountId': account_id},
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
-            print(f"Add to group response for {group_name}: Status={response.status_code}")
-            
+            logger.debug("Add to group response for %s: Status=%s", group_name, response.status_code)
+
             if response.status_code in [200, 201, 204]:
-                print(f" Successfully added {user_email} to group: {group_name}")
+                logger.debug("Successfully added %s to group: %s", user_email, group_name)
+                return True
+            elif response.status_code == 409:
+                # Some tenants report duplicates as a conflict rather than 400
+                logger.debug("User already in group: %s", group_name)
                 return True
             elif response.status_code == 400:
-                error_text = response.text
-                print(f"400 error for group {group_name}: {error_text[:500]}")
-                
-                error_lower = error_text.lower()
-                if 'already a member' in error_lower or 'already in' in error_lower:
-                    print(f"User already in group: {group_name}")
+                # Prefer the structured errorMessages over the raw body
+                try:
+                    errors = ' '.join(json_loads(response.content).get('errorMessages', []))
+                except Exception:
+                    errors = response.text
+
+                if _ERR_ALREADY_MEMBER_RE.search(errors or response.text):
+                    logger.info("User already in group: %s", group_name)
                     return True
-                else:
-                    return False
+
+                logger.warning("400 error for group %s: %s", group_name, _body_snippet(response))
+                return False
             else:
-                print(f"Failed with status {response.status_code}: {response.text[:200]}")
+                logger.warning("Failed with status %s: %s", response.status_code, _body_snippet(response, 200))
                 return False
                 
         except Exception as e:
-            print(f"Exception adding to group {group_name}: {str(e)}")
+            logger.warning("Exception adding to group %s: %s", group_name, str(e))
             return False
 
+# Shared manager instances - both classes only hold cached credentials,
+# auth headers and lookup caches, so one instance per container lets those
+# survive warm invocations instead of being rebuilt per handler call
+m365_manager = Microsoft365Manager()
+atlassian_manager = AtlassianManager()
+
 def get_cross_account_clients():
     """Get or create cross-account clients for production account"""
-    global ssm_prod, ec2_prod
-    
-    if ssm_prod is None or ec2_prod is None:
-        try:
-            role_arn = f"arn:aws:iam::{PROD_ACCOUNT_ID}:role/{CROSS_ACCOUNT_ROLE_NAME}"
-            
-            print(f"Assuming role: {role_arn}")
-            
-            assumed_role = sts.assume_role(
-                RoleArn=role_arn,
-                RoleSessionName='EmployeeOnboardingLambda',
-                ExternalId=EXTERNAL_ID
-            )
-            
-            credentials = assumed_role['Credentials']
-            
+    global ssm_prod, ec2_prod, _cross_account_expiration
+
+    # Reuse the cached clients while the assumed-role credentials still have
+    # at least 120s left; warm containers otherwise either re-assumed per
+    # invocation or kept clients past their credential expiry
+    if ssm_prod is not None and ec2_prod is not None and _cross_account_expiration is not None:
+        remaining = (_cross_account_expiration - datetime.now(_cross_account_expiration.tzinfo)).total_seconds()
+        if remaining > 120:
+            return ssm_prod, ec2_prod
+        logger.info("Cross-account credentials near expiry (%ss left), re-assuming role", int(remaining))
+
+    try:
+        role_arn = f"arn:aws:iam::{PROD_ACCOUNT_ID}:role/{CROSS_ACCOUNT_ROLE_NAME}"
+        
+        logger.info("Assuming role: %s", role_arn)
+        
+        assumed_role = aws_client('sts').assume_role(
+            RoleArn=role_arn,
+            RoleSessionName='EmployeeOnboardingLambda',
+            ExternalId=EXTERNAL_ID,
+            DurationSeconds=3600
+        )
+        
+        credentials = assumed_role['Credentials']
+        _cross_account_expiration = credentials['Expiration']
+        
+        # Same lock as aws_client: boto3.client() on the default session is
+        # not safe to call concurrently from the background pool
+        with _aws_clients_lock:
             ssm_prod = boto3.client(
                 'ssm',
                 aws_access_key_id=credentials['AccessKeyId'],
                 aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken']
+                aws_session_token=credentials['SessionToken'],
+                config=_BOTO_CFG
             )
-            
+
             ec2_prod = boto3.client(
                 'ec2',
                 aws_access_key_id=credentials['AccessKeyId'],
                 aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken']
+                aws_session_token=credentials['SessionToken'],
+                config=_BOTO_CFG
             )
-            
-            print("Successfully created cross-account clients")
-            
-        except Exception as e:
-            print(f"Error assuming cross-account role: {str(e)}")
-            raise
-    
+        
+        logger.info("Successfully created cross-account clients")
+        
+    except Exception as e:
+        logger.warning("Error assuming cross-account role: %s", str(e))
+        raise
+
     return ssm_prod, ec2_prod
 
 def get_secret(secret_name):
-    """Retrieve secret from AWS Secrets Manager"""
+    """Retrieve secret from AWS Secrets Manager (cached per container with TTL)"""
+
+    # Check cache first - secrets are reused across warm invocations
+    cached = _secret_cache.get(secret_name)
+    if cached and time.time() - cached['fetched_at'] < SECRET_CACHE_TTL_SECONDS:
+        return cached['value']
+
     try:
-        response = secrets_manager.get_secret_value(SecretId=secret_name)
-        return json.loads(response['SecretString'])
+        response = aws_client('secretsmanager').get_secret_value(SecretId=secret_name)
+        value = json.loads(response['SecretString'])
+        _secret_cache[secret_name] = {'value': value, 'fetched_at': time.time()}
+        return value
     except ClientError as e:
-        print(f"Error retrieving secret {secret_name}: {e}")
+        logger.warning("Error retrieving secret %s: %s", secret_name, e)
+        # Fall back to stale cached value if we have one (e.g. transient throttling)
+        if cached:
+            logger.info("Using cached value for secret %s", secret_name)
+            return cached['value']
         return None
 
 def get_ou_mapping():
     """Get OU mapping configuration from Secrets Manager"""
     return get_secret(OU_MAPPING_SECRET)
 
+# Resolved DC instance IDs - discovery costs several describe_instances and
+# describe_instance_information calls and the answer is stable for a container
+DC_INSTANCE_TTL_SECONDS = 900
+_dc_instance_cache = {}
+
 def get_dc_instance_id(domain=None, dc_host=None):
     """Dynamically find DC instance ID in production account"""
+    cache_key = (domain, dc_host)
+    cached = _dc_instance_cache.get(cache_key)
+    if cached and time.time() - cached['fetched_at'] < DC_INSTANCE_TTL_SECONDS:
+        return cached['instance_id']
+
+    instance_id = _discover_dc_instance_id(domain, dc_host)
+    _dc_instance_cache[cache_key] = {'instance_id': instance_id, 'fetched_at': time.time()}
+    return instance_id
+
+def _discover_dc_instance_id(domain=None, dc_host=None):
+    """Run the actual EC2/SSM discovery behind get_dc_instance_id"""
     _, ec2_prod_client = get_cross_account_clients()
     
     if dc_host and dc_host.startswith('i-'):
         try:
             response = ec2_prod_client.describe_instances(InstanceIds=[dc_host])
             if response['Reservations']:
-                print(f"Using existing instance ID in prod account: {dc_host}")
+                logger.info("Using existing instance ID in prod account: %s", dc_host)
                 return dc_host
         except:
-            print(f"Instance ID {dc_host} not found in prod account, searching for alternatives")
+            logger.warning("Instance ID %s not found in prod account, searching for alternatives", dc_host)
     
     if domain:
         try:
@@ -1603,18 +2361,18 @@ def get_dc_instance_id(domain=None, dc_host=None):
                                 Filters=[{'Key': 'InstanceIds', 'Values': [instance_id]}]
                             )
                             if ssm_info['InstanceInformationList']:
-                                print(f"Found DC instance {instance_id} in prod account for domain {domain}")
+                                logger.info("Found DC instance %s in prod account for domain %s", instance_id, domain)
                                 return instance_id
                         except:
                             continue
                         
         except Exception as e:
-            print(f"Error finding DC instance in prod account: {str(e)}")
+            logger.warning("Error finding DC instance in prod account: %s", str(e))
     
     try:
         ssm_prod_client, _ = get_cross_account_clients()
         
-        print("Searching for Windows instances with SSM in production account...")
+        logger.info("Searching for Windows instances with SSM in production account...")
         
         ssm_instances = ssm_prod_client.describe_instance_information(
             Filters=[
@@ -1624,11 +2382,11 @@ def get_dc_instance_id(domain=None, dc_host=None):
         
         for instance in ssm_instances['InstanceInformationList']:
             instance_id = instance['InstanceId']
-            print(f"Found Windows instance with SSM in prod: {instance_id}")
+            logger.info("Found Windows instance with SSM in prod: %s", instance_id)
             return instance_id
                         
     except Exception as e:
-        print(f"Error in prod account DC search: {str(e)}")
+        logger.warning("Error in prod account DC search: %s", str(e))
     
     raise ValueError("No suitable Domain Controller instance found in production account")
 
@@ -1638,40 +2396,63 @@ def determine_ou_and_domain(employee_data, ou_mapping):
     department = employee_data.get('department', '').lower()
     work_location = employee_data.get('workLocation', '').lower()
     company = employee_data.get('company', '').lower()
-    
+
+    # Build the combined haystack once - it was previously reassembled inside
+    # the loop for every rule with keywords
+    all_text = f"{department} {work_location} {company} {employee_data.get('fullName', '')}".lower()
+
+    matched = None
     for rule in ou_mapping['rules']:
         conditions = rule.get('conditions', {})
-        
+
         if 'departments' in conditions:
             if any(dept.lower() in department for dept in conditions['departments']):
-                dc_instance_id = get_dc_instance_id(rule['domain'], rule.get('dc_host'))
-                return (rule['ou'], rule['domain'], dc_instance_id, 
-                       rule.get('netbios_domain', rule['domain'].split('.')[0].upper()))
-        
+                matched = rule
+                break
+
         if 'locations' in conditions:
             if any(loc.lower() in work_location for loc in conditions['locations']):
-                dc_instance_id = get_dc_instance_id(rule['domain'], rule.get('dc_host'))
-                return (rule['ou'], rule['domain'], dc_instance_id,
-                       rule.get('netbios_domain', rule['domain'].split('.')[0].upper()))
-        
+                matched = rule
+                break
+
         if 'keywords' in conditions:
-            all_text = f"{department} {work_location} {company} {employee_data.get('fullName', '')}".lower()
             if any(keyword.lower() in all_text for keyword in conditions['keywords']):
-                dc_instance_id = get_dc_instance_id(rule['domain'], rule.get('dc_host'))
-                return (rule['ou'], rule['domain'], dc_instance_id,
-                       rule.get('netbios_domain', rule['domain'].split('.')[0].upper()))
-    
+                matched = rule
+                break
+
+    # Resolve the DC instance once for whichever rule (or default) matched
+    if matched:
+        dc_instance_id = get_dc_instance_id(matched['domain'], matched.get('dc_host'))
+        return (matched['ou'], matched['domain'], dc_instance_id,
+               matched.get('netbios_domain', matched['domain'].split('.')[0].upper()))
+
     default = ou_mapping.get('default', {})
     dc_instance_id = get_dc_instance_id(default.get('domain'), default.get('dc_host'))
     return (default.get('ou'), default.get('domain'), dc_instance_id,
            default.get('netbios_domain', default.get('domain', '').split('.')[0].upper()))
 
-def execute_ps_script(script, instance_id):
-    """Execute PowerShell script via SSM in production account"""
+def _psq(value):
+    """Quote a value as a PowerShell single-quoted string literal
+
+    Doubling embedded quotes is the only escape single-quoted PS strings
+    need, so names like O'Brien can't break (or inject into) a script.
+    """
+    return "'" + str(value).replace("'", "''") + "'"
+
+def execute_ps_script(script, instance_id, params=None):
+    """Execute PowerShell script via SSM in production account
+
+    When params is given, it is passed to the script as a JSON object bound
+    to $P, so static script templates can be shared across calls instead of
+    being rebuilt by string interpolation per invocation.
+    """
     try:
         ssm_prod_client, _ = get_cross_account_clients()
+
+        if params is not None:
+            script = f"$P = {_psq(json_dumps(params))} | ConvertFrom-Json\n" + script
         
-        print(f"Executing PowerShell script on instance: {instance_id} in prod account")
+        logger.info("Executing PowerShell script on instance: %s in prod account", instance_id)
         
         response = ssm_prod_client.send_command(
             InstanceIds=[instance_id],
@@ -1683,23 +2464,34 @@ def execute_ps_script(script, instance_id):
         )
         
         command_id = response['Command']['CommandId']
-        print(f"SSM Command ID: {command_id}")
-        
-        max_attempts = 30
-        for i in range(max_attempts):
-            time.sleep(2)
-            
+        logger.info("SSM Command ID: %s", command_id)
+        
+        # Poll with exponential backoff: fast scripts (AD lookups finish in
+        # well under a second on the DC) used to eat a fixed 2s first sleep;
+        # slow ones back off to 5s polls up to the command's own 300s timeout
+        deadline = time.monotonic() + 300
+        delay = 0.2
+        attempt = 0
+
+        while True:
+            time.sleep(delay)
+            delay = min(delay * 1.5, 5.0)
+            attempt += 1
+
             try:
                 result = ssm_prod_client.get_command_invocation(
                     CommandId=command_id,
                     InstanceId=instance_id
                 )
-                
-                if result['Status'] in ['Success', 'Failed']:
+
+                if (result['Status'] in ('Success', 'Failed', 'Cancelled', 'TimedOut')
+                        or time.monotonic() > deadline):
                     break
             except ClientError as e:
                 if e.response['Error']['Code'] == 'InvocationDoesNotExist':
-                    print(f"Waiting for command to be registered... (attempt {i+1}/{max_attempts})")
+                    logger.info("Waiting for command to be registered... (attempt %s)", attempt)
+                    if time.monotonic() > deadline:
+                        raise
                     continue
                 else:
                     raise
@@ -1708,61 +2500,79 @@ def execute_ps_script(script, instance_id):
             return result['StandardOutputContent']
         else:
             error_output = result.get('StandardErrorContent', 'No error details available')
-            print(f"Command failed with output: {result.get('StandardOutputContent', '')}")
-            print(f"Error output: {error_output}")
+            logger.warning("Command failed with output: %s", result.get('StandardOutputContent', ''))
+            logger.warning("Error output: %s", error_output)
             raise Exception(f"Command failed: {error_output}")
             
     except Exception as e:
-        print(f"Error executing PowerShell script: {str(e)}")
+        logger.warning("Error executing PowerShell script: %s", str(e))
         raise
 
+# Name cleanup runs in the C regex engine instead of a per-character
+# Python-level isalnum() generator. [\W_] keeps the old Unicode semantics:
+# accented letters pass like isalnum(), only punctuation/whitespace drop
+_NON_ALNUM_RE = re.compile(r'[\W_]')
+
+# EMAIL_FORMAT is fixed at module load, so pick the local-part builder once
+# instead of re-checking the format string on every call
+if EMAIL_FORMAT == "firstinitial.lastname":
+    def _email_local_part(first_name, last_name):
+        return f"{first_name[0]}.{last_name}" if first_name else last_name
+else:
+    def _email_local_part(first_name, last_name):
+        return f"{first_name}.{last_name}"
+
 def generate_email(first_name, last_name, domain):
     """Generate email address based on format and domain"""
-    first_name = first_name.lower().strip()
-    last_name = last_name.lower().strip()
-    
-    first_name = ''.join(c for c in first_name if c.isalnum())
-    last_name = ''.join(c for c in last_name if c.isalnum())
-    
-    if EMAIL_FORMAT == "firstinitial.lastname":
-        if first_name:
-            email = f"{first_name[0]}.{last_name}@{domain}"
-        else:
-            email = f"{last_name}@{domain}"
-    else:
-        email = f"{first_name}.{last_name}@{domain}"
-    
-    return email
+    first_name = _NON_ALNUM_RE.sub('', first_name.lower().strip())
+    last_name = _NON_ALNUM_RE.sub('', last_name.lower().strip())
+
+    return f"{_email_local_part(first_name, last_name)}@{domain}"
 
 def generate_username(email):
     """Generate username from email"""
     username = email.split('@')[0]
     return username[:20]
 
+_domain_creds_cache = {}
+
 def get_domain_credentials(domain, default_credentials):
     """Get domain-specific credentials if configured, with proper fallback"""
     # First check if default credentials exist
     if not default_credentials:
-        print(f"Warning: No default AD credentials found")
+        logger.warning("Warning: No default AD credentials found")
         return None
-    
+
+    # The resolved credentials are stable per domain - skip the lookup (and
+    # the Secrets Manager miss for domains with no dedicated secret) on
+    # repeat calls in a warm container
+    cached = _domain_creds_cache.get(domain)
+    if cached:
+        return cached
+
+    # Work on a copy: the default credentials come from the shared secret
+    # cache and must not be mutated in place
+    default_credentials = dict(default_credentials)
+
     # Try to get domain-specific credentials
     try:
         domain_prefix = domain.split('.')[0].lower()
         domain_secret_name = f"{AD_CREDENTIALS_SECRET}-{domain_prefix}"
-        print(f"Checking for domain-specific secret: {domain_secret_name}")
+        logger.info("Checking for domain-specific secret: %s", domain_secret_name)
         
         domain_secret = get_secret(domain_secret_name)
         if domain_secret:
-            print(f"Using domain-specific credentials for {domain}")
+            logger.info("Using domain-specific credentials for %s", domain)
+            domain_secret = dict(domain_secret)
             # Ensure proper username format for the domain
             if 'username' in domain_secret and '\\' not in domain_secret['username']:
                 # Add domain prefix if not present
                 netbios_domain = domain.split('.')[0].upper()
                 domain_secret['username'] = f"{netbios_domain}\\{domain_secret['username']}"
+            _domain_creds_cache[domain] = domain_secret
             return domain_secret
     except Exception as e:
-        print(f"No domain-specific credentials found for {domain}, using default")
+        logger.info("No domain-specific credentials found for %s, using default", domain)
     
     # Use default credentials but ensure proper format
     if default_credentials:
@@ -1773,58 +2583,67 @@ def get_domain_credentials(domain, default_credentials):
             if '\\' not in username and '@' not in username:
                 netbios_domain = 'YOUR_COMPANY_NAME'  # Default to YOUR_COMPANY_NAME based on your setup
                 default_credentials['username'] = f"{netbios_domain}\\{username}"
-                print(f"Updated username format to: {default_credentials['username']}")
+                logger.info("Updated username format to: %s", default_credentials['username'])
             elif '\\' in username:
                 # Ensure the domain prefix is correct
                 parts = username.split('\\')
                 if len(parts) == 2 and parts[0].lower() == 'aws':
                     # Fix incorrect 'aws\' prefix
                     default_credentials['username'] = f"YOUR_COMPANY_NAME\\{parts[1]}"
-                    print(f"Fixed username format from aws\\ to: {default_credentials['username']}")
-    
+                    logger.info("Fixed username format from aws\\ to: %s", default_credentials['username'])
+
+    _domain_creds_cache[domain] = default_credentials
     return default_credentials
 
-def find_user_in_ad(search_name, domain, dc_host):
-    """Find user by name, email, or username"""
-    
-    if not search_name:
-        return None
-    
+def find_users_in_ad(search_names, domain, dc_host):
+    """Find multiple users by name, email, or username in one SSM round trip
+
+    Each execute_ps_script call costs send_command plus ~2s of polling, so
+    resolving N names separately pays that latency N times. One script
+    searches for all of them and the results come back keyed by search term.
+    """
+
+    search_names = [name for name in search_names if name]
+    if not search_names:
+        return {}
+
+    ps_names = ", ".join(_psq(name) for name in search_names)
     ps_script = f"""
     Import-Module ActiveDirectory
-    
-    $searchTerms = '{search_name}'
-    
-    $user = Get-ADUser -Filter "Name -eq '$searchTerms' -or DisplayName -eq '$searchTerms' -or SamAccountName -eq '$searchTerms' -or EmailAddress -eq '$searchTerms'" `
-                      -Properties DisplayName, EmailAddress, SamAccountName -ErrorAction SilentlyContinue | 
-                      Select-Object -First 1
-    
-    if ($user) {{
-        Write-Output "USER_FOUND: $($user.SamAccountName)"
-        Write-Output "USER_NAME: $($user.Name)"
-        Write-Output "USER_EMAIL: $($user.EmailAddress)"
-    }} else {{
-        Write-Output "USER_NOT_FOUND"
+
+    $results = @{{}}
+    foreach ($searchTerms in @({ps_names})) {{
+        $user = Get-ADUser -LDAPFilter "(|(name=$searchTerms)(displayName=$searchTerms)(sAMAccountName=$searchTerms)(mail=$searchTerms))" `
+                          -Properties DisplayName, EmailAddress, SamAccountName -ResultSetSize 1 -ErrorAction SilentlyContinue |
+                          Select-Object -First 1
+
+        if ($user) {{
+            $results[$searchTerms] = @{{
+                username = $user.SamAccountName
+                name = $user.Name
+                email = $user.EmailAddress
+            }}
+        }}
     }}
+    $results | ConvertTo-Json -Compress
     """
-    
+
     try:
         result = execute_ps_script(ps_script, dc_host)
-        
-        user_info = {}
-        for line in result.split('\n'):
-            if line.startswith('USER_FOUND:'):
-                user_info['username'] = line.split(':', 1)[1].strip()
-            elif line.startswith('USER_NAME:'):
-                user_info['name'] = line.split(':', 1)[1].strip()
-            elif line.startswith('USER_EMAIL:'):
-                user_info['email'] = line.split(':', 1)[1].strip()
-        
-        return user_info if user_info else None
+        parsed = json_loads(result.strip()) if result and result.strip() else {}
+        return parsed if isinstance(parsed, dict) else {}
     except Exception as e:
-        print(f"Error finding user in AD: {str(e)}")
+        logger.warning("Error finding users in AD: %s", str(e))
+        return {}
+
+def find_user_in_ad(search_name, domain, dc_host):
+    """Find user by name, email, or username"""
+
+    if not search_name:
         return None
 
+    return find_users_in_ad([search_name], domain, dc_host).get(search_name) or None
+
 def trigger_ad_sync(domain, dc_instance_id):
     """Trigger AD Connect sync for domain"""
     
@@ -1841,48 +2660,84 @@ def trigger_ad_sync(domain, dc_instance_id):
         result = execute_ps_script(ps_script, dc_instance_id)
         return True
     except Exception as e:
-        print(f"Error triggering AD sync: {str(e)}")
+        logger.warning("Error triggering AD sync: %s", str(e))
         return False
 
 def process_microsoft_365_integration_enhanced(user_email, source_user_identifier=None):
     """Handle Microsoft 365 license assignment and complete access replication"""
-    
-    m365_manager = Microsoft365Manager()
-    
+
     try:
-        # Quick check if user exists in Azure AD
-        user_exists = m365_manager.check_user_exists(user_email)
-        
-        if not user_exists:
+        # SKU discovery can fail on its own (Graph error, tenant out of
+        # licenses) - that must not masquerade as the user being unsynced,
+        # so it degrades to an existence-only batch and an errors entry
+        license_info = None
+        license_error = None
+        try:
+            license_info = m365_manager.find_business_premium_license()
+        except Exception as e:
+            license_error = f"Failed to assign license: {str(e)}"
+
+        # Existence check, usage location and license assignment go out as
+        # one $batch call instead of three sequential Graph round trips
+        try:
+            if license_info:
+                responses = m365_manager.setup_user_licensing(user_email, license_info['skuId'])
+            else:
+                responses = m365_manager.graph_batch([{
+                    'id': 'user',
+                    'method': 'GET',
+                    'url': f'/users/{user_email}?$select=id,displayName,mail,userPrincipalName'
+                }])
+        except Exception as e:
+            return {
+                'user_synced': False,
+                'license_assigned': False,
+                'access_replicated': False,
+                'errors': [f'M365 setup batch failed: {str(e)}']
+            }
+
+        user_response = responses.get('user', {})
+        if user_response.get('status') != 200:
             return {
                 'user_synced': False,
                 'license_assigned': False,
                 'access_replicated': False,
                 'errors': [f'User {user_email} not found in Azure AD']
             }
-        
+
+        _m365_user_cache[user_email.lower().strip()] = {
+            'user': user_response.get('body'),
+            'fetched_at': time.time()
+        }
+
         m365_results = {
             'user_synced': True,
             'license_assigned': False,
             'access_replicated': False,
             'errors': []
         }
-        
-        # Assign Business Premium license
-        try:
-            # First set usage location
-            location_set = m365_manager.set_user_usage_location(user_email, 'GB')
-            if not location_set:
+
+        if license_error:
+            m365_results['errors'].append(license_error)
+            logger.error("%s", license_error)
+        else:
+            if responses.get('location', {}).get('status') not in (200, 204):
                 m365_results['errors'].append("Failed to set usage location")
-            
-            license_result = m365_manager.assign_license_to_user(user_email)
-            m365_results['license_assigned'] = True
-            m365_results['license_info'] = license_result
-            print(f"Successfully assigned license to {user_email}")
-        except Exception as e:
-            error_msg = f"Failed to assign license: {str(e)}"
-            m365_results['errors'].append(error_msg)
-            print(error_msg)
+
+            license_response = responses.get('license', {})
+            if license_response.get('status') in (200, 202):
+                m365_results['license_assigned'] = True
+                m365_results['license_info'] = {
+                    'success': True,
+                    'license_sku_id': license_info['skuId'],
+                    'license_name': license_info['skuPartNumber'],
+                    'message': f"License {license_info['skuPartNumber']} assigned to {user_email}"
+                }
+                logger.info("Successfully assigned license to %s", user_email)
+            else:
+                error_msg = f"Failed to assign license: {license_response.get('status')} - {license_response.get('body')}"
+                m365_results['errors'].append(error_msg)
+                logger.error("%s", error_msg)
         
         # Replicate access if source user provided
         if source_user_identifier:
@@ -1893,11 +2748,11 @@ def process_microsoft_365_integration_enhanced(user_email, source_user_identifie
                 )
                 m365_results['access_replicated'] = True
                 m365_results['replication_info'] = replication_result
-                print(f"Successfully replicated M365 access from {source_user_identifier}")
+                logger.info("Successfully replicated M365 access from %s", source_user_identifier)
             except Exception as e:
                 error_msg = f"Failed to replicate M365 access: {str(e)}"
                 m365_results['errors'].append(error_msg)
-                print(error_msg)
+                logger.exception("%s", error_msg)
         
         return m365_results
         
@@ -1915,18 +2770,16 @@ def process_atlassian_integration(user_email: str, display_name: str, source_use
     
     # Check if Atlassian is enabled
     if not ATLASSIAN_ENABLED:
-        print("Atlassian integration is disabled")
+        logger.info("Atlassian integration is disabled")
         return {
             'enabled': False,
             'message': 'Atlassian integration is disabled'
         }
     
     try:
-        atlassian_manager = AtlassianManager()
-        
         # Check if credentials are available
         if not atlassian_manager.get_credentials():
-            print("Atlassian credentials not available")
+            logger.info("Atlassian credentials not available")
             return {
                 'enabled': False,
                 'message': 'Atlassian credentials not configured'
@@ -1969,7 +2822,7 @@ def process_atlassian_integration(user_email: str, display_name: str, source_use
         
     except Exception as e:
         error_msg = f"Atlassian integration error: {str(e)}"
-        print(error_msg)
+        logger.exception("%s", error_msg)
         return {
             'enabled': True,
             'account_created': False,
@@ -1981,94 +2834,125 @@ def handle_delayed_m365_and_atlassian_processing(sqs_message):
     """Handle M365 and Atlassian processing from delayed SQS message"""
     
     try:
-        message_data = json.loads(sqs_message['body'])
+        message_data = json_loads(sqs_message['body'])
         
         user_email = message_data['user_email']
         ticket_key = message_data['ticket_key']
         source_user_identifier = message_data.get('source_user_identifier')
         retry_count = message_data.get('retry_count', 0)
         employee_data = message_data.get('employee_data', {})
+        idempotency_key = message_data.get('idempotency_key') or build_idempotency_key(ticket_key, user_email)
+
+        # SQS is at-least-once - skip duplicate deliveries of work that already
+        # completed in this container
+        if already_processed(idempotency_key):
+            logger.info("Skipping duplicate delivery for %s (ticket %s)", user_email, ticket_key)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'success': True,
+                    'processed': 'duplicate_delivery_skipped',
+                    'user_email': user_email
+                })
+            }
+
+        logger.info("Processing delayed M365 and Atlassian integration for %s (retry #%s)", user_email, retry_count)
         
-        print(f"Processing delayed M365 and Atlassian integration for {user_email} (retry #{retry_count})")
-        
-        # Process M365 integration
-        m365_results = process_microsoft_365_integration_enhanced(user_email, source_user_identifier)
-        
-        # Process Atlassian integration if enabled
+        # M365 and Atlassian are independent providers, each with multi-second
+        # latency - run both integrations concurrently instead of back-to-back
         atlassian_results = None
         if ATLASSIAN_ENABLED:
             display_name = employee_data.get('fullName', f"{employee_data.get('firstName', '')} {employee_data.get('lastName', '')}")
-            atlassian_results = process_atlassian_integration(
-                user_email, 
-                display_name, 
-                source_user_identifier
-            )
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                m365_future = executor.submit(
+                    process_microsoft_365_integration_enhanced, user_email, source_user_identifier
+                )
+                atlassian_future = executor.submit(
+                    process_atlassian_integration, user_email, display_name, source_user_identifier
+                )
+
+                m365_results = m365_future.result()
+                atlassian_results = atlassian_future.result()
+        else:
+            m365_results = process_microsoft_365_integration_enhanced(user_email, source_user_identifier)
         
         # Update Jira with results
         if ticket_key:
             if m365_results.get('user_synced'):
-                success_message = f""" **Microsoft 365 Integration Completed Successfully!**
+                # Collect the comment as parts and join once - repeated +=
+                # reallocates the growing string on every append
+                parts = [f""" **Microsoft 365 Integration Completed Successfully!**
 
 **User:** {user_email}
 **Status:** User synced to Azure AD and license assigned
 **License:** {" Assigned" if m365_results.get('license_assigned') else " Failed"}
-**Groups Replicated:** {" Completed" if m365_results.get('access_replicated') else "N/A"}"""
-                
+**Groups Replicated:** {" Completed" if m365_results.get('access_replicated') else "N/A"}"""]
+
                 if m365_results.get('replication_info'):
                     rep_info = m365_results['replication_info']
                     groups_count = len(rep_info.get('groups_added', []))
                     groups_skipped = len(rep_info.get('groups_skipped', []))
                     if groups_count > 0:
-                        success_message += f"\n**Groups Added:** {groups_count}"
-                        success_message += f"\n  • " + "\n  • ".join(rep_info['groups_added'][:5])
+                        parts.append(f"\n**Groups Added:** {groups_count}")
+                        parts.append("\n  • " + "\n  • ".join(rep_info['groups_added'][:5]))
                         if groups_count > 5:
-                            success_message += f"\n  • ... and {groups_count - 5} more"
+                            parts.append(f"\n  • ... and {groups_count - 5} more")
                     if groups_skipped > 0:
-                        success_message += f"\n**Groups Skipped:** {groups_skipped} (mail-enabled/system groups)"
-                
+                        parts.append(f"\n**Groups Skipped:** {groups_skipped} (mail-enabled/system groups)")
+
                 if atlassian_results and atlassian_results.get('enabled'):
-                    success_message += f"""
+                    parts.append(f"""
 
 **Atlassian Integration:**
-**Account:** {" Created/Exists" if atlassian_results.get('account_created') else " Failed"}"""
-                    
+**Account:** {" Created/Exists" if atlassian_results.get('account_created') else " Failed"}""")
+
                     if atlassian_results.get('details'):
                         details = atlassian_results['details']
                         groups_count = len(details.get('groups_added', []))
                         projects_count = len(details.get('projects_added', []))
                         if groups_count > 0:
-                            success_message += f"\n**Groups Added:** {groups_count}"
-                            success_message += f"\n  • " + "\n  • ".join(details['groups_added'][:3])
+                            parts.append(f"\n**Groups Added:** {groups_count}")
+                            parts.append("\n  • " + "\n  • ".join(details['groups_added'][:3]))
                         if projects_count > 0:
-                            success_message += f"\n**Project Roles Added:** {projects_count}"
-                            success_message += f"\n  • " + "\n  • ".join(details['projects_added'][:3])
-                
+                            parts.append(f"\n**Project Roles Added:** {projects_count}")
+                            parts.append("\n  • " + "\n  • ".join(details['projects_added'][:3]))
+
                 if m365_results.get('errors') or (atlassian_results and atlassian_results.get('error')):
-                    success_message += f"\n\n **Issues Encountered:**"
+                    parts.append("\n\n **Issues Encountered:**")
                     for error in m365_results.get('errors', []):
-                        success_message += f"\n- M365: {error}"
+                        parts.append(f"\n- M365: {error}")
                     if atlassian_results and atlassian_results.get('error'):
-                        success_message += f"\n- Atlassian: {atlassian_results['error']}"
-                
-                update_jira_ticket(ticket_key, success_message, success=True)
+                        parts.append(f"\n- Atlassian: {atlassian_results['error']}")
+
+                update_jira_ticket(ticket_key, ''.join(parts), success=True)
             else:
                 # User still not synced, schedule retry if not exceeded max retries
                 if retry_count < 3:  # Max 3 retries
-                    print(f"User not synced yet, scheduling retry #{retry_count + 1}")
+                    logger.info("User not synced yet, scheduling retry #%s", retry_count + 1)
                     message_data['retry_count'] = retry_count + 1
-                    
-                    # Schedule retry with shorter delay (5 minutes)
-                    sqs.send_message(
-                        QueueUrl=M365_DELAY_QUEUE_URL,
-                        MessageBody=json.dumps(message_data),
-                        DelaySeconds=300  # 5 minutes
-                    )
-                    
-                    update_jira_ticket(
-                        ticket_key,
-                        f"⏳ M365 integration retry #{retry_count + 1} scheduled. User {user_email} not yet synced to Azure AD.",
-                        success=True
-                    )
+
+                    # Per-retry progress comments are each a Jira API call;
+                    # only the terminal success/failure comment is posted
+                    # unless verbose updates are explicitly enabled. The
+                    # post overlaps the SQS send below and is joined before
+                    # returning so the container can't freeze mid-flight.
+                    retry_comment = None
+                    if VERBOSE_JIRA_UPDATES:
+                        retry_comment = update_jira_ticket(
+                            ticket_key,
+                            f"⏳ M365 integration retry #{retry_count + 1} scheduled. User {user_email} not yet synced to Azure AD.",
+                            success=True,
+                            fire_and_forget=True
+                        )
+
+                    # Schedule retry with shorter delay (5 minutes) - goes
+                    # through the batching helper so multiple retries in one
+                    # invocation share SendMessageBatch calls
+                    send_m365_delay_messages([message_data], delay_seconds=300)
+
+                    if retry_comment is not None:
+                        wait([retry_comment])
                 else:
                     # Max retries exceeded
                     failure_message = f""" **Microsoft 365 Integration Failed**
@@ -2085,6 +2969,11 @@ def handle_delayed_m365_and_atlassian_processing(sqs_message):
                     
                     update_jira_ticket(ticket_key, failure_message, success=False)
         
+        # Terminal outcomes (user synced, or retries exhausted) are recorded so
+        # a duplicate delivery doesn't redo the whole flow
+        if m365_results.get('user_synced') or retry_count >= 3:
+            mark_processed(idempotency_key)
+
         return {
             'statusCode': 200,
             'body': json.dumps({
@@ -2098,7 +2987,7 @@ def handle_delayed_m365_and_atlassian_processing(sqs_message):
         
     except Exception as e:
         error_msg = f"Error in delayed processing: {str(e)}"
-        print(error_msg)
+        logger.exception("%s", error_msg)
         
         # Update Jira with error if ticket_key available
         if 'ticket_key' in message_data:
@@ -2116,83 +3005,84 @@ def handle_delayed_m365_and_atlassian_processing(sqs_message):
             })
         }
 
-def update_jira_ticket(ticket_key, message, success=True):
-    """Update Jira ticket with comment"""
-    
+def update_jira_ticket(ticket_key, message, success=True, fire_and_forget=False):
+    """Update Jira ticket with comment
+
+    With fire_and_forget=True the POST runs on the background pool and a
+    future is returned - use it for status-only comments whose outcome
+    doesn't affect control flow, and wait() the future before returning
+    from the handler.
+    """
+
+    if fire_and_forget:
+        return _background_pool.submit(update_jira_ticket, ticket_key, message, success)
+
     if not ticket_key:
-        print("No ticket key provided for Jira update")
+        logger.info("No ticket key provided for Jira update")
         return
-    
-    if ticket_key.startswith('TEST-'):
-        print(f"Skipping Jira update for test ticket: {ticket_key}")
+
+    if ticket_key.split('-', 1)[0] in _TEST_PROJECTS:
+        logger.info("Skipping Jira update for test ticket: %s", ticket_key)
         return
-    
+
     try:
-        jira_creds = get_secret(JIRA_CREDENTIALS_SECRET)
-        
-        auth_string = f"{jira_creds['username']}:{jira_creds['apiToken']}"
-        auth_b64 = base64.b64encode(auth_string.encode('ascii')).decode('ascii')
-        
-        headers = {
-            'Authorization': f'Basic {auth_b64}',
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-        
+        headers = _get_jira_headers()
+        if headers is None:
+            logger.warning("Jira credentials unavailable, skipping update for %s", ticket_key)
+            return
+
         if isinstance(message, dict) and success:
-            formatted_message = f""" AD account created successfully!
+            parts = [f""" AD account created successfully!
 
 **Account Details:**
 - Username: {message.get('username')}
 - Email: {message.get('email')}
 - Domain: {message.get('domain')}
-- OU: {message.get('ou', 'N/A')}"""
+- OU: {message.get('ou', 'N/A')}"""]
 
             if message.get('access_replicated_from'):
                 replication_summary = message.get('replication_summary', {})
-                formatted_message += f"""
-
-**Access Replicated From:** {message['access_replicated_from']}
+                parts.append(f"""**Access Replicated From:** {message['access_replicated_from']}
 - Groups Copied: {len(replication_summary.get('groups_copied', []))}
-- Groups List: {', '.join(replication_summary.get('groups_copied', [])) if replication_summary.get('groups_copied') else 'None'}"""
-                
+- Groups List: {', '.join(replication_summary.get('groups_copied', [])) if replication_summary.get('groups_copied') else 'None'}""")
+
                 if message.get('replication_warning'):
-                    formatted_message += f"\n\n Warning: {message['replication_warning']}"
+                    parts.append(f" Warning: {message['replication_warning']}")
+
+            formatted_message = "\n\n".join(parts)
         else:
             formatted_message = str(message)
         
-        comment_body = {
-            "body": {
-                "type": "doc",
-                "version": 1,
-                "content": [
-                    {
-                        "type": "paragraph",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": formatted_message
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
-        
-        import urllib3
-        http = urllib3.PoolManager()
-        
-        response = http.request(
+        # Skip the POST when the exact same comment was just posted to this
+        # ticket - retries and overlapping error paths otherwise spam it
+        digest = hashlib.sha256(formatted_message.encode('utf-8')).digest()
+        last = _recent_jira_comments.get(ticket_key)
+        now = time.monotonic()
+        if last and last[0] == digest and now - last[1] < JIRA_COMMENT_DEDUPE_SECONDS:
+            logger.info("Skipping duplicate Jira comment for %s", ticket_key)
+            return
+        _recent_jira_comments[ticket_key] = (digest, now)
+
+        comment_body = _ADF_COMMENT_TEMPLATE % json_dumps(formatted_message)
+
+        response = _jira_http.request(
             'POST',
             f"{JIRA_URL}/rest/api/3/issue/{ticket_key}/comment",
-            body=json.dumps(comment_body),
+            body=comment_body.encode('utf-8'),
             headers=headers
         )
         
-        if response.status != 201:
-            print(f"Failed to update Jira ticket: {response.status} - {response.data}")
-    except Exception as e:
-        print(f"Error updating Jira ticket: {str(e)}")
+        if response.status == 401:
+            # Credentials rotated - drop the cached header so the next call
+            # rebuilds it from a fresh secret
+            global _jira_auth_headers
+            _jira_auth_headers = None
+            logger.warning("Jira authentication failed (401), cleared cached auth header")
+        elif response.status != 201:
+            logger.warning("Failed to update Jira ticket: %s - %s", response.status, response.data)
+    except (urllib3.exceptions.HTTPError, ClientError, ValueError, KeyError) as e:
+        # Network/credential trouble posting a comment never fails the run
+        logger.warning("Error updating Jira ticket: %s", str(e))
 
 def send_error_notification(error_message, ticket_key):
     """Send error notification via SNS"""
@@ -2206,331 +3096,250 @@ Time: {datetime.now().isoformat()}
 
 Please check CloudWatch logs for more details."""
         
-        sns.publish(
+        aws_client('sns').publish(
             TopicArn=ERROR_TOPIC_ARN,
             Subject=f"Onboarding Error - Ticket {ticket_key}",
             Message=message
         )
     except Exception as e:
-        print(f"Error sending notification: {str(e)}")
+        logger.warning("Error sending notification: %s", str(e))
 
-def create_ad_user(employee_data, ad_credentials):
-    """Create AD user in the appropriate domain"""
-    
-    ou_mapping = get_ou_mapping()
-    target_ou, email_domain, dc_host, netbios_domain = determine_ou_and_domain(employee_data, ou_mapping)
-    
-    if not target_ou or not email_domain:
-        raise ValueError("Could not determine target OU or domain for user")
-    
-    print(f"Creating user in Domain: {email_domain}, OU: {target_ou}, DC: {dc_host}")
-    
-    email = generate_email(employee_data['firstName'], employee_data['lastName'], email_domain)
-    username = generate_username(email)
-    
-    # Get proper credentials for the domain
-    domain_creds = get_domain_credentials(email_domain, ad_credentials)
-    
-    if not domain_creds:
-        raise ValueError("No AD credentials available for domain operations")
-    
-    # Ensure username has proper format
-    cred_username = domain_creds['username']
-    cred_password = domain_creds['password']
-    
-    ps_script = f"""
+# Key/value markers emitted by the PowerShell scripts below. One multiline
+# scan pulls all of them out of the output instead of prefix-probing every
+# line (replication output runs to hundreds of lines on group-heavy users)
+_PS_OUTPUT_KV_RE = re.compile(
+    r'^\s*(TEMPPASS|OU|COPIED_GROUPS|FAILED_GROUPS|SKIPPED_GROUPS|SUCCESS|DOMAIN|NETBIOS):[ \t]*(.*)$',
+    re.M
+)
+
+def _parse_ps_output(output_text):
+    """Extract the KEY: value markers from PowerShell output into a dict"""
+    return {m.group(1): m.group(2).strip() for m in _PS_OUTPUT_KV_RE.finditer(output_text)}
+
+# PowerShell templates for the cross-account AD operations. Static text is
+# defined once; per-call values arrive through the $P JSON parameter block
+# that execute_ps_script prepends, so nothing is interpolated into the
+# script body (which also keeps quotes in names from breaking the script)
+_CREATE_USER_PS = """
     $ErrorActionPreference = 'Stop'
     
     Import-Module ActiveDirectory
     
-    $password = ConvertTo-SecureString '{cred_password}' -AsPlainText -Force
-    $credential = New-Object System.Management.Automation.PSCredential ('{cred_username}', $password)
+    $password = ConvertTo-SecureString $P.CredPassword -AsPlainText -Force
+    $credential = New-Object System.Management.Automation.PSCredential ($P.CredUsername, $password)
     
-    $userPassword = -join ((65..90) + (97..122) + (48..57) + (33,35,36,37,38,42,43,45,46,47,58,59,61,63,64,91,93,94,95,123,125,126) | Get-Random -Count 16 | ForEach-Object {{[char]$_}})
+    $userPassword = -join ((65..90) + (97..122) + (48..57) + (33,35,36,37,38,42,43,45,46,47,58,59,61,63,64,91,93,94,95,123,125,126) | Get-Random -Count 16 | ForEach-Object {[char]$_})
     $securePassword = ConvertTo-SecureString $userPassword -AsPlainText -Force
     
-    Write-Output "Target Domain: {email_domain}"
-    Write-Output "NetBIOS Domain: {netbios_domain}"
-    Write-Output "Target OU: {target_ou}"
-    Write-Output "Using credentials: {cred_username}"
+    Write-Output "Target Domain: $($P.EmailDomain)"
+    Write-Output "NetBIOS Domain: $($P.NetbiosDomain)"
+    Write-Output "Target OU: $($P.TargetOU)"
+    Write-Output "Using credentials: $($P.CredUsername)"
     
-    try {{
+    try {
         $dc = [System.DirectoryServices.ActiveDirectory.Domain]::GetCurrentDomain().DomainControllers[0].Name
         Write-Output "Using Domain Controller: $dc"
-    }} catch {{
+    } catch {
         $dc = "$env:COMPUTERNAME.$env:USERDNSDOMAIN"
         Write-Output "Using fallback DC: $dc"
-    }}
+    }
     
-    try {{
-        $existingUser = Get-ADUser -Filter "SamAccountName -eq '{username}' -or UserPrincipalName -eq '{email}'" `
-                                  -Server $dc -Credential $credential -ErrorAction SilentlyContinue
+    try {
+        $existingUser = Get-ADUser -LDAPFilter "(|(sAMAccountName=$($P.Username))(userPrincipalName=$($P.Email)))" `
+                                  -ResultSetSize 1 -Server $dc -Credential $credential -ErrorAction SilentlyContinue
         
-        if ($existingUser) {{
-            Write-Output "ERROR: User {username} already exists in domain {email_domain}"
+        if ($existingUser) {
+            Write-Output "ERROR: User $($P.Username) already exists in domain $($P.EmailDomain)"
             exit 1
-        }}
-    }} catch {{
-        Write-Output "User {username} does not exist, proceeding with creation"
-    }}
+        }
+    } catch {
+        Write-Output "User $($P.Username) does not exist, proceeding with creation"
+    }
     
-    $targetPath = '{target_ou}'
-    try {{
-        $ouExists = Get-ADOrganizationalUnit -Identity '{target_ou}' -Server $dc -Credential $credential -ErrorAction Stop
+    $targetPath = $P.TargetOU
+    try {
+        $ouExists = Get-ADOrganizationalUnit -Identity $P.TargetOU -Server $dc -Credential $credential -ErrorAction Stop
         Write-Output "OU verified: $($ouExists.DistinguishedName)"
-    }} catch {{
-        Write-Output "WARNING: Target OU '{target_ou}' not found, looking for alternatives..."
+    } catch {
+        Write-Output "WARNING: Target OU '$($P.TargetOU)' not found, looking for alternatives..."
         
-        try {{
-            $availableOUs = Get-ADOrganizationalUnit -Filter * -Server $dc -Credential $credential | 
-                           Where-Object {{ $_.Name -like '*User*' -or $_.Name -like '*Employee*' }} | 
+        try {
+            $availableOUs = Get-ADOrganizationalUnit -LDAPFilter "(|(ou=*User*)(ou=*Employee*))" -SearchBase $P.DomainDN `
+                           -ResultSetSize 1 -Server $dc -Credential $credential |
                            Select-Object -First 1
             
-            if ($availableOUs) {{
+            if ($availableOUs) {
                 $targetPath = $availableOUs.DistinguishedName
                 Write-Output "Using alternative OU: $targetPath"
-            }} else {{
-                $targetPath = "CN=Users,DC={email_domain.replace('.', ',DC=')}"
+            } else {
+                $targetPath = "CN=Users,$($P.DomainDN)"
                 Write-Output "Using Users container: $targetPath"
-            }}
-        }} catch {{
-            $targetPath = "DC={email_domain.replace('.', ',DC=')}"
+            }
+        } catch {
+            $targetPath = $P.DomainDN
             Write-Output "Using domain root: $targetPath"
-        }}
-    }}
+        }
+    }
     
-    $userParams = @{{
-        SamAccountName = '{username}'
-        UserPrincipalName = '{email}'
-        Name = '{employee_data['fullName']}'
-        GivenName = '{employee_data['firstName']}'
-        Surname = '{employee_data['lastName']}'
-        DisplayName = '{employee_data['fullName']}'
-        EmailAddress = '{email}'
+    $userParams = @{
+        SamAccountName = $P.Username
+        UserPrincipalName = $P.Email
+        Name = $P.FullName
+        GivenName = $P.FirstName
+        Surname = $P.LastName
+        DisplayName = $P.FullName
+        EmailAddress = $P.Email
         AccountPassword = $securePassword
         Enabled = $true
         ChangePasswordAtLogon = $true
         Path = $targetPath
         Server = $dc
         Credential = $credential
-    }}
+    }
     
-    if ('{employee_data.get('jobTitle', '')}') {{ $userParams.Title = '{employee_data.get('jobTitle', '')}' }}
-    if ('{employee_data.get('department', '')}') {{ $userParams.Department = '{employee_data.get('department', '')}' }}
-    if ('{employee_data.get('workLocation', '')}') {{ $userParams.Office = '{employee_data.get('workLocation', '')}' }}
+    if ($P.JobTitle) { $userParams.Title = $P.JobTitle }
+    if ($P.Department) { $userParams.Department = $P.Department }
+    if ($P.WorkLocation) { $userParams.Office = $P.WorkLocation }
     
-    switch ('{email_domain}') {{
-        'YOUR_COMPANY_NAME.COM' {{ $userParams.Company = 'YOUR_COMPANY_NAME' }}
-        'YOUR_COMPANY_NAME.COM' {{ $userParams.Company = 'YOUR_COMPANY_NAME' }}
-        'YOUR_COMPANY_NAME.COM' {{ $userParams.Company = 'YOUR_COMPANY_NAME' }}
-        default {{ $userParams.Company = '{email_domain}'.Split('.')[0] }}
-    }}
+    switch ($P.EmailDomain) {
+        'YOUR_COMPANY_NAME.COM' { $userParams.Company = 'YOUR_COMPANY_NAME' }
+        'YOUR_COMPANY_NAME.COM' { $userParams.Company = 'YOUR_COMPANY_NAME' }
+        'YOUR_COMPANY_NAME.COM' { $userParams.Company = 'YOUR_COMPANY_NAME' }
+        default { $userParams.Company = $P.EmailDomain.Split('.')[0] }
+    }
     
-    if ('{employee_data.get('manager', '')}') {{
-        $managerName = '{employee_data.get('manager', '')}'
-        $manager = Get-ADUser -Filter "Name -eq '$managerName' -or DisplayName -eq '$managerName'" `
-                             -Server $dc -Credential $credential -ErrorAction SilentlyContinue | 
+    if ($P.Manager) {
+        $managerName = $P.Manager
+        $manager = Get-ADUser -LDAPFilter "(|(name=$managerName)(displayName=$managerName))" `
+                             -ResultSetSize 1 -Server $dc -Credential $credential -ErrorAction SilentlyContinue |
                    Select-Object -First 1
-        if ($manager) {{
+        if ($manager) {
             $userParams.Manager = $manager.DistinguishedName
             Write-Output "Manager found: $($manager.Name)"
-        }} else {{
+        } else {
             Write-Output "Manager not found: $managerName"
-        }}
-    }}
+        }
+    }
     
-    try {{
+    try {
         New-ADUser @userParams
-        Write-Output "SUCCESS: Created user {username} with email {email} in domain {email_domain}"
+        Write-Output "SUCCESS: Created user $($P.Username) with email $($P.Email) in domain $($P.EmailDomain)"
         Write-Output "TEMPPASS: $userPassword"
-        Write-Output "DOMAIN: {email_domain}"
-        Write-Output "NETBIOS: {netbios_domain}"
+        Write-Output "DOMAIN: $($P.EmailDomain)"
+        Write-Output "NETBIOS: $($P.NetbiosDomain)"
         Write-Output "OU: $targetPath"
-    }} catch {{
+    } catch {
         Write-Output "ERROR: Failed to create user: $_"
         exit 1
-    }}
-    """
-    
-    try:
-        result = execute_ps_script(ps_script, dc_host)
-        
-        output_text = result
-        result_data = {
-            'success': True,
-            'username': username,
-            'email': email,
-            'domain': email_domain,
-            'dc_host': dc_host,
-            'message': f"User {username} created successfully"
-        }
-        
-        for line in output_text.split('\n'):
-            if line.startswith('TEMPPASS:'):
-                result_data['tempPassword'] = line.split(':', 1)[1].strip()
-            elif line.startswith('OU:'):
-                result_data['ou'] = line.split(':', 1)[1].strip()
-        
-        copy_from_user = employee_data.get('copyAccessFrom') or employee_data.get('replicateAccessFrom')
-        
-        if copy_from_user and result_data['success']:
-            print(f"Attempting to replicate access from: {copy_from_user}")
-            
-            source_user_info = find_user_in_ad(copy_from_user, email_domain, dc_host)
-            
-            if source_user_info:
-                print(f"Found source user: {source_user_info['username']}")
-                
-                replication_result = replicate_user_access(
-                    source_user_info['username'],
-                    result_data['username'],
-                    email_domain,
-                    dc_host,
-                    domain_creds  # Pass credentials to replication function
-                )
-                
-                result_data['access_replicated_from'] = copy_from_user
-                result_data['groups'] = replication_result['groups_copied']
-                result_data['replication_summary'] = replication_result
-                
-                print(f"Access replication completed. Groups copied: {len(replication_result['groups_copied'])}")
-            else:
-                print(f"Warning: Could not find source user '{copy_from_user}' for access replication")
-                result_data['replication_warning'] = f"Could not find user '{copy_from_user}' to copy access from"
-        
-        return result_data
-            
-    except Exception as e:
-        print(f"Error creating AD user: {str(e)}")
-        raise
+    }
+"""
 
-def replicate_user_access(source_username, target_username, domain, dc_host, credentials=None):
-    """Replicate all access from source user to target user with proper credentials"""
-    
-    # Use provided credentials or get them
-    if not credentials:
-        credentials = get_domain_credentials(domain, get_secret(AD_CREDENTIALS_SECRET))
-    
-    if not credentials:
-        print("Warning: No credentials available for access replication")
-        return {
-            'source_user': source_username,
-            'target_user': target_username,
-            'groups_copied': [],
-            'groups_failed': [],
-            'success': False,
-            'error': 'No credentials available'
-        }
-    
-    cred_username = credentials['username']
-    cred_password = credentials['password']
-    
-    ps_script = f"""
+_REPLICATE_ACCESS_PS = """
     $ErrorActionPreference = 'Continue'
     Import-Module ActiveDirectory
     
     # Set up credentials
-    $password = ConvertTo-SecureString '{cred_password}' -AsPlainText -Force
-    $credential = New-Object System.Management.Automation.PSCredential ('{cred_username}', $password)
+    $password = ConvertTo-SecureString $P.CredPassword -AsPlainText -Force
+    $credential = New-Object System.Management.Automation.PSCredential ($P.CredUsername, $password)
     
-    Write-Output "Using credentials: {cred_username}"
+    Write-Output "Using credentials: $($P.CredUsername)"
     
-    try {{
+    try {
         # Get domain controller
-        try {{
+        try {
             $dc = [System.DirectoryServices.ActiveDirectory.Domain]::GetCurrentDomain().DomainControllers[0].Name
             Write-Output "Using DC: $dc"
-        }} catch {{
+        } catch {
             $dc = "$env:COMPUTERNAME.$env:USERDNSDOMAIN"
             Write-Output "Using fallback DC: $dc"
-        }}
+        }
         
         # Search for source user more thoroughly
-        Write-Output "Searching for source user: {source_username}"
+        Write-Output "Searching for source user: $($P.SourceUsername)"
         $sourceUser = $null
         
         # Try multiple search methods
-        try {{
-            $sourceUser = Get-ADUser -Identity '{source_username}' -Properties MemberOf, Department, Title, Manager, Office -Server $dc -Credential $credential -ErrorAction Stop
+        try {
+            $sourceUser = Get-ADUser -Identity $P.SourceUsername -Properties MemberOf -Server $dc -Credential $credential -ErrorAction Stop
             Write-Output "Found user by Identity: $($sourceUser.SamAccountName)"
-        }} catch {{
+        } catch {
             Write-Output "Identity search failed, trying filter search..."
-            $sourceUser = Get-ADUser -Filter "SamAccountName -eq '{source_username}' -or UserPrincipalName -eq '{source_username}' -or EmailAddress -eq '{source_username}'" -Properties MemberOf, Department, Title, Manager, Office -Server $dc -Credential $credential -ErrorAction SilentlyContinue | Select-Object -First 1
-            if ($sourceUser) {{
+            $sourceUser = Get-ADUser -LDAPFilter "(|(sAMAccountName=$($P.SourceUsername))(userPrincipalName=$($P.SourceUsername))(mail=$($P.SourceUsername)))" -Properties MemberOf -ResultSetSize 1 -Server $dc -Credential $credential -ErrorAction SilentlyContinue | Select-Object -First 1
+            if ($sourceUser) {
                 Write-Output "Found user by Filter: $($sourceUser.SamAccountName)"
-            }}
-        }}
+            }
+        }
         
-        if (-not $sourceUser) {{
-            Write-Output "ERROR: Source user {source_username} not found in AD"
+        if (-not $sourceUser) {
+            Write-Output "ERROR: Source user $($P.SourceUsername) not found in AD"
             Write-Output "COPIED_GROUPS: "
             Write-Output "FAILED_GROUPS: "
             exit 1
-        }}
+        }
         
         Write-Output "SOURCE_USER_FOUND: $($sourceUser.Name)"
         Write-Output "SOURCE_USER_DN: $($sourceUser.DistinguishedName)"
         
         # Get all groups of source user
         Write-Output "Getting group memberships..."
-        if ($sourceUser.MemberOf) {{
+        if ($sourceUser.MemberOf) {
             Write-Output "MemberOf property contains $($sourceUser.MemberOf.Count) groups"
             $sourceGroups = @()
-            foreach ($groupDN in $sourceUser.MemberOf) {{
-                try {{
+            foreach ($groupDN in $sourceUser.MemberOf) {
+                try {
                     Write-Output "Processing group DN: $groupDN"
                     $group = Get-ADGroup -Identity $groupDN -Server $dc -Credential $credential -ErrorAction SilentlyContinue
-                    if ($group) {{
+                    if ($group) {
                         # Skip default groups and system groups
-                        if ($group.Name -notin @('Domain Users', 'Authenticated Users', 'Everyone')) {{
+                        if ($group.Name -notin @('Domain Users', 'Authenticated Users', 'Everyone')) {
                             # Check if it's a security group (not distribution)
-                            if ($group.GroupCategory -eq 'Security') {{
+                            if ($group.GroupCategory -eq 'Security') {
                                 $sourceGroups += $group
                                 Write-Output "Added security group: $($group.Name) (Category: $($group.GroupCategory), Scope: $($group.GroupScope))"
-                            }} else {{
+                            } else {
                                 Write-Output "Skipped distribution group: $($group.Name) (Category: $($group.GroupCategory))"
-                            }}
-                        }} else {{
+                            }
+                        } else {
                             Write-Output "Skipped system group: $($group.Name)"
-                        }}
-                    }} else {{
+                        }
+                    } else {
                         Write-Output "Could not resolve group DN: $groupDN"
-                    }}
-                }} catch {{
+                    }
+                } catch {
                     Write-Output "Error processing group DN '$groupDN': $_"
-                }}
-            }}
-        }} else {{
+                }
+            }
+        } else {
             Write-Output "No MemberOf property found, trying Get-ADPrincipalGroupMembership..."
-            try {{
+            try {
                 $allGroups = Get-ADPrincipalGroupMembership -Identity $sourceUser -Server $dc -Credential $credential
-                $sourceGroups = $allGroups | Where-Object {{ 
+                $sourceGroups = $allGroups | Where-Object { 
                     $_.Name -notin @('Domain Users', 'Authenticated Users', 'Everyone') -and
                     $_.GroupCategory -eq 'Security'
-                }}
+                }
                 Write-Output "Found $($sourceGroups.Count) security groups via Get-ADPrincipalGroupMembership"
-                foreach ($group in $sourceGroups) {{
+                foreach ($group in $sourceGroups) {
                     Write-Output "Found group: $($group.Name) (Category: $($group.GroupCategory), Scope: $($group.GroupScope))"
-                }}
-            }} catch {{
+                }
+            } catch {
                 Write-Output "Get-ADPrincipalGroupMembership failed: $_"
                 $sourceGroups = @()
-            }}
-        }}
+            }
+        }
         
         Write-Output "GROUPS_COUNT: $($sourceGroups.Count)"
         
-        if ($sourceGroups.Count -eq 0) {{
+        if ($sourceGroups.Count -eq 0) {
             Write-Output "WARNING: No groups found for source user"
             Write-Output "COPIED_GROUPS: "
             Write-Output "FAILED_GROUPS: "
-            Write-Output "SUCCESS: Access replicated from {source_username} to {target_username} (0 groups)"
+            Write-Output "SUCCESS: Access replicated from $($P.SourceUsername) to $($P.TargetUsername) (0 groups)"
             exit 0
-        }}
+        }
         
         # Get target user
-        Write-Output "Getting target user: {target_username}"
-        $targetUser = Get-ADUser -Identity '{target_username}' -Server $dc -Credential $credential -ErrorAction Stop
+        Write-Output "Getting target user: $($P.TargetUsername)"
+        $targetUser = Get-ADUser -Identity $P.TargetUsername -Server $dc -Credential $credential -ErrorAction Stop
         Write-Output "TARGET_USER_FOUND: $($targetUser.Name)"
         
         # Copy AD group memberships
@@ -2538,49 +3347,180 @@ def replicate_user_access(source_username, target_username, domain, dc_host, cre
         $failedGroups = @()
         $skippedGroups = @()
         
-        foreach ($group in $sourceGroups) {{
+        # Try one batched membership add first: a single request to the DC
+        # instead of one LDAP modify (plus lookup) per group. Falls back to
+        # the per-group loop so individual failures keep per-group reporting.
+        $batchAdded = $false
+        try {
+            Add-ADPrincipalGroupMembership -Identity $targetUser.DistinguishedName -MemberOf ($sourceGroups | ForEach-Object DistinguishedName) -Server $dc -Credential $credential -ErrorAction Stop
+            $copiedGroups = @($sourceGroups | ForEach-Object Name)
+            $batchAdded = $true
+            Write-Output "Batched group add succeeded for $($sourceGroups.Count) groups"
+        } catch {
+            Write-Output "Batched group add failed ($_), falling back to per-group adds"
+        }
+        
+        if (-not $batchAdded) {
+        foreach ($group in $sourceGroups) {
             Write-Output "Attempting to add to group: $($group.Name) (DN: $($group.DistinguishedName))"
-            try {{
-                # Check if group allows member addition
-                $groupInfo = Get-ADGroup -Identity $group.DistinguishedName -Properties GroupCategory, GroupScope -Server $dc -Credential $credential
-                
-                if ($groupInfo.GroupCategory -eq 'Security') {{
-                    Add-ADGroupMember -Identity $group.DistinguishedName -Members $targetUser.DistinguishedName -Server $dc -Credential $credential -ErrorAction Stop
-                    $copiedGroups += $group.Name
-                    Write-Output "SUCCESS: Added to security group: $($group.Name)"
-                }} else {{
-                    $skippedGroups += $group.Name
-                    Write-Output "SKIPPED: Cannot add to distribution group: $($group.Name)"
-                }}
-            }} catch {{
-                if ($_.Exception.Message -like "*already a member*") {{
+            try {
+                # $sourceGroups already contains only Security groups, so no
+                # need to re-fetch the category before adding
+                Add-ADGroupMember -Identity $group.DistinguishedName -Members $targetUser.DistinguishedName -Server $dc -Credential $credential -ErrorAction Stop
+                $copiedGroups += $group.Name
+                Write-Output "SUCCESS: Added to security group: $($group.Name)"
+            } catch {
+                if ($_.Exception.Message -like "*already a member*") {
                     $copiedGroups += $group.Name
                     Write-Output "Already member of: $($group.Name)"
-                }} elseif ($_.Exception.Message -like "*mail-enabled*" -or $_.Exception.Message -like "*distribution*") {{
+                } elseif ($_.Exception.Message -like "*mail-enabled*" -or $_.Exception.Message -like "*distribution*") {
                     $skippedGroups += $group.Name
                     Write-Output "SKIPPED: Mail-enabled/distribution group: $($group.Name)"
-                }} else {{
+                } else {
                     $failedGroups += $group.Name
                     Write-Output "FAILED to add to group: $($group.Name) - $_"
-                }}
-            }}
-        }}
+                }
+            }
+        }
+        }
         
         Write-Output "COPIED_GROUPS: $($copiedGroups -join ',')"
         Write-Output "FAILED_GROUPS: $($failedGroups -join ',')"
         Write-Output "SKIPPED_GROUPS: $($skippedGroups -join ',')"
-        Write-Output "SUCCESS: Access replicated from {source_username} to {target_username}"
+        Write-Output "SUCCESS: Access replicated from $($P.SourceUsername) to $($P.TargetUsername)"
         
-    }} catch {{
+    } catch {
         Write-Output "ERROR: $_"
         Write-Output "COPIED_GROUPS: "
         Write-Output "FAILED_GROUPS: "
         throw
-    }}
-    """
+    }
+"""
+
+def create_ad_user(employee_data, ad_credentials):
+    """Create AD user in the appropriate domain"""
+    
+    ou_mapping = get_ou_mapping()
+    target_ou, email_domain, dc_host, netbios_domain = determine_ou_and_domain(employee_data, ou_mapping)
+    
+    if not target_ou or not email_domain:
+        raise ValueError("Could not determine target OU or domain for user")
     
+    logger.info("Creating user in Domain: %s, OU: %s, DC: %s", email_domain, target_ou, dc_host)
+    
+    email = generate_email(employee_data['firstName'], employee_data['lastName'], email_domain)
+    username = generate_username(email)
+    
+    # Get proper credentials for the domain
+    domain_creds = get_domain_credentials(email_domain, ad_credentials)
+    
+    if not domain_creds:
+        raise ValueError("No AD credentials available for domain operations")
+    
+    # Ensure username has proper format
+    cred_username = domain_creds['username']
+    cred_password = domain_creds['password']
+    
+    ps_params = {
+        'CredUsername': cred_username,
+        'CredPassword': cred_password,
+        'Username': username,
+        'Email': email,
+        'EmailDomain': email_domain,
+        'NetbiosDomain': netbios_domain,
+        'TargetOU': target_ou,
+        'DomainDN': 'DC=' + email_domain.replace('.', ',DC='),
+        'FullName': employee_data['fullName'],
+        'FirstName': employee_data['firstName'],
+        'LastName': employee_data['lastName'],
+        'JobTitle': employee_data.get('jobTitle', ''),
+        'Department': employee_data.get('department', ''),
+        'WorkLocation': employee_data.get('workLocation', ''),
+        'Manager': employee_data.get('manager', ''),
+    }
+
     try:
-        result = execute_ps_script(ps_script, dc_host)
+        result = execute_ps_script(_CREATE_USER_PS, dc_host, params=ps_params)
+        
+        output_text = result
+        result_data = {
+            'success': True,
+            'username': username,
+            'email': email,
+            'domain': email_domain,
+            'dc_host': dc_host,
+            'message': f"User {username} created successfully"
+        }
+        
+        ps_values = _parse_ps_output(output_text)
+        if 'TEMPPASS' in ps_values:
+            result_data['tempPassword'] = ps_values['TEMPPASS']
+        if 'OU' in ps_values:
+            result_data['ou'] = ps_values['OU']
+        
+        copy_from_user = employee_data.get('copyAccessFrom') or employee_data.get('replicateAccessFrom')
+        
+        if copy_from_user and result_data['success']:
+            logger.info("Attempting to replicate access from: %s", copy_from_user)
+            
+            source_user_info = find_user_in_ad(copy_from_user, email_domain, dc_host)
+            
+            if source_user_info:
+                logger.info("Found source user: %s", source_user_info['username'])
+                
+                replication_result = replicate_user_access(
+                    source_user_info['username'],
+                    result_data['username'],
+                    email_domain,
+                    dc_host,
+                    domain_creds  # Pass credentials to replication function
+                )
+                
+                result_data['access_replicated_from'] = copy_from_user
+                result_data['groups'] = replication_result['groups_copied']
+                result_data['replication_summary'] = replication_result
+                
+                logger.info("Access replication completed. Groups copied: %s", len(replication_result['groups_copied']))
+            else:
+                logger.warning("Warning: Could not find source user '%s' for access replication", copy_from_user)
+                result_data['replication_warning'] = f"Could not find user '{copy_from_user}' to copy access from"
+        
+        return result_data
+            
+    except Exception as e:
+        logger.warning("Error creating AD user: %s", str(e))
+        raise
+
+def replicate_user_access(source_username, target_username, domain, dc_host, credentials=None):
+    """Replicate all access from source user to target user with proper credentials"""
+    
+    # Use provided credentials or get them
+    if not credentials:
+        credentials = get_domain_credentials(domain, get_secret(AD_CREDENTIALS_SECRET))
+    
+    if not credentials:
+        logger.warning("Warning: No credentials available for access replication")
+        return {
+            'source_user': source_username,
+            'target_user': target_username,
+            'groups_copied': [],
+            'groups_failed': [],
+            'success': False,
+            'error': 'No credentials available'
+        }
+    
+    cred_username = credentials['username']
+    cred_password = credentials['password']
+    
+    ps_params = {
+        'CredUsername': cred_username,
+        'CredPassword': cred_password,
+        'SourceUsername': source_username,
+        'TargetUsername': target_username,
+    }
+
+    try:
+        result = execute_ps_script(_REPLICATE_ACCESS_PS, dc_host, params=ps_params)
         
         replication_summary = {
             'source_user': source_username,
@@ -2590,21 +3530,21 @@ def replicate_user_access(source_username, target_username, domain, dc_host, cre
             'success': False
         }
         
-        for line in result.split('\n'):
-            if line.startswith('COPIED_GROUPS:'):
-                groups = line.split(':', 1)[1].strip()
-                if groups:
-                    replication_summary['groups_copied'] = [g.strip() for g in groups.split(',') if g.strip()]
-            elif line.startswith('FAILED_GROUPS:'):
-                groups = line.split(':', 1)[1].strip()
-                if groups:
-                    replication_summary['groups_failed'] = [g.strip() for g in groups.split(',') if g.strip()]
-            elif line.startswith('SUCCESS:'):
-                replication_summary['success'] = True
+        ps_values = _parse_ps_output(result)
+        if ps_values.get('COPIED_GROUPS'):
+            replication_summary['groups_copied'] = [
+                g.strip() for g in ps_values['COPIED_GROUPS'].split(',') if g.strip()
+            ]
+        if ps_values.get('FAILED_GROUPS'):
+            replication_summary['groups_failed'] = [
+                g.strip() for g in ps_values['FAILED_GROUPS'].split(',') if g.strip()
+            ]
+        if 'SUCCESS' in ps_values:
+            replication_summary['success'] = True
         
         return replication_summary
     except Exception as e:
-        print(f"Error replicating access: {str(e)}")
+        logger.warning("Error replicating access: %s", str(e))
         return {
             'source_user': source_username,
             'target_user': target_username,
@@ -2622,45 +3562,35 @@ def lambda_handler(event, context):
     if event_type == 'sqs_delayed_m365':
         # Handle delayed M365 and Atlassian processing
         return handle_delayed_m365_and_atlassian_processing(event['Records'][0])
+
+    elif event_type == 'scheduled_m365':
+        # One-time schedules aren't auto-deleted on the pinned SDK, so the
+        # fired invocation cleans up after itself before processing
+        if event.get('schedule_name'):
+            try:
+                aws_client('scheduler').delete_schedule(Name=event['schedule_name'])
+            except ClientError as e:
+                logger.warning("Could not delete fired schedule %s: %s", event['schedule_name'], e)
+
+        # EventBridge Scheduler delivers the message directly as the event
+        return handle_delayed_m365_and_atlassian_processing({'body': json_dumps(event)})
     
     elif event_type == 'sns_onboarding':
         # Handle new user onboarding
         ticket_key = None
-        
+        background_tasks = []
+        # Milestones are collected here and posted to Jira as one comment at
+        # the end - each separate status comment used to cost an HTTPS POST
+        status_lines = []
+
         try:
             # Parse SNS message - handle both formats
             sns_record = event['Records'][0]['Sns']
             message_content = sns_record.get('Message', '')
             
-            # Check if it's a JSON string or key-value pairs from Jira
-            try:
-                # First try to parse as direct JSON
-                sns_message = json.loads(message_content)
-                
-                # Check if it's wrapped in automationData (Jira format)
-                if 'automationData' in sns_message:
-                    if 'default' in sns_message['automationData']:
-                        # Parse the nested JSON string
-                        sns_message = json.loads(sns_message['automationData']['default'])
-                
-            except:
-                # If that fails, check if it's from Jira automation with MessageAttributes
-                if 'MessageAttributes' in sns_record:
-                    # Jira sends data in MessageAttributes with a 'default' key
-                    default_attr = sns_record['MessageAttributes'].get('default', {})
-                    if default_attr and 'Value' in default_attr:
-                        sns_message = json.loads(default_attr['Value'])
-                    else:
-                        # Try to build from individual attributes
-                        sns_message = {}
-                        for key, value in sns_record['MessageAttributes'].items():
-                            if 'Value' in value:
-                                sns_message[key] = value['Value']
-                else:
-                    # Last resort - try to parse the message itself
-                    sns_message = {'error': 'Could not parse message', 'raw': message_content}
-            
-            print(f"Parsed SNS message: {json.dumps(sns_message)}")
+            sns_message = _parse_sns_onboarding_message(sns_record, message_content)
+
+            logger.info("Parsed SNS message: %s", json_dumps(sns_message))
             
             ticket_key = sns_message.get('ticketKey')
             employee_data = sns_message.get('employeeData', {})
@@ -2681,12 +3611,8 @@ def lambda_handler(event, context):
                 if not employee_data.get(field):
                     raise ValueError(f"Missing required field: {field}")
             
-            # Update Jira - starting
-            update_jira_ticket(
-                ticket_key, 
-                " Automated onboarding process started. Creating AD account..."
-            )
-            
+            status_lines.append(" Automated onboarding process started.")
+
             # Get AD credentials
             ad_creds = get_secret(AD_CREDENTIALS_SECRET)
             
@@ -2696,16 +3622,11 @@ def lambda_handler(event, context):
             # Create AD user (with access replication if specified)
             ad_result = create_ad_user(employee_data, ad_creds)
             
-            # Update Jira with AD creation result
-            update_jira_ticket(ticket_key, ad_result)
-            
+            status_lines.append(" AD account created.")
+
             # Trigger AD sync
-            update_jira_ticket(
-                ticket_key,
-                " AD sync triggered. Microsoft 365 and Atlassian integration scheduled for 15 minutes to allow sync completion..."
-            )
-            
-            sync_success = trigger_ad_sync(ad_result['domain'], ad_result['dc_host'])
+            status_lines.append(" AD sync triggered.")
+            background_tasks.append(_background_pool.submit(trigger_ad_sync, ad_result['domain'], ad_result['dc_host']))
             
             # Schedule M365 and Atlassian processing with delay
             try:
@@ -2756,7 +3677,8 @@ def lambda_handler(event, context):
 - AD Groups Copied: {len(replication_summary.get('groups_copied', []))}
 - M365 & Atlassian Access: Will be replicated after sync"""
                     
-                    update_jira_ticket(ticket_key, success_message, success=True)
+                    # Single terminal comment carrying every milestone
+                    update_jira_ticket(ticket_key, "\n\n".join(status_lines + [success_message]), success=True)
                 else:
                     # Fallback to immediate processing
                     ad_result['m365_results'] = m365_schedule_result
@@ -2764,7 +3686,7 @@ def lambda_handler(event, context):
                 
             except Exception as m365_error:
                 error_msg = f"Integration scheduling failed: {str(m365_error)}"
-                print(error_msg)
+                logger.exception("%s", error_msg)
                 
                 update_jira_ticket(
                     ticket_key,
@@ -2772,6 +3694,10 @@ def lambda_handler(event, context):
                     success=True
                 )
             
+            # Join the background sync trigger before the container is
+            # allowed to freeze
+            wait(background_tasks)
+
             return {
                 'statusCode': 200,
                 'body': json.dumps({
@@ -2784,19 +3710,25 @@ def lambda_handler(event, context):
             
         except Exception as e:
             error_msg = str(e)
-            print(f"Error: {error_msg}")
-            
-            # Update Jira with error
+            logger.warning("Error: %s", error_msg)
+
+            wait(background_tasks)
+
+            # Update Jira with error, including how far the run got
             if ticket_key:
-                update_jira_ticket(
-                    ticket_key,
-                    f" Onboarding automation failed: {error_msg}\n\nManual intervention required.",
-                    success=False
-                )
+                error_comment = f" Onboarding automation failed: {error_msg}\n\nManual intervention required."
+                if status_lines:
+                    error_comment = "\n\n".join(status_lines + [error_comment])
+                update_jira_ticket(ticket_key, error_comment, success=False)
                 
                 # Send error notification
                 send_error_notification(error_msg, ticket_key)
-            
+
+            # Transient AWS failures should surface to Lambda so SNS
+            # redelivers instead of acknowledging a half-done onboarding
+            if _is_retryable_aws_error(e):
+                raise
+
             return {
                 'statusCode': 500,
                 'body': json.dumps({
@@ -2804,7 +3736,7 @@ def lambda_handler(event, context):
                     'error': error_msg
                 })
             }
-    
+
     else:
         return {
             'statusCode': 400,